@@ -1,55 +1,227 @@
+import math
 import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
+
+from fuzzy_engine import MamdaniEngine
+
+TEMPERATURE_RANGE = (25, 73)
+HUMIDITY_RANGE = (0, 90)
+
+# Fuzzy variables
+UNIVERSES = {
+    'temperature': np.arange(25, 74, 1),
+    'humidity': np.arange(0, 91, 1),
+    'temperature_adjustment': np.arange(25, 74, 1),
+}
+
+# Membership functions (trimf corners)
+MEMBERSHIP_FUNCTIONS = {
+    'temperature': {'low': [25, 31, 36], 'warm': [34, 43, 60], 'high': [55, 70, 73]},
+    'humidity': {'low': [0, 30, 40], 'average': [30, 50, 60], 'high': [55, 60, 90]},
+    'temperature_adjustment': {'low': [25, 31, 36], 'warm': [34, 43, 60], 'high': [55, 70, 73]},
+}
+
+# Fuzzy rules: terms of one variable are OR'ed, variables are AND'ed
+RULES = [
+    ({'temperature': ('high', 'warm', 'low'), 'humidity': ('high',)}, 'low'),
+    ({'temperature': ('high',), 'humidity': ('low',)}, 'high'),
+    ({'temperature': ('high',), 'humidity': ('average',)}, 'warm'),
+    ({'temperature': ('warm',), 'humidity': ('low',)}, 'high'),
+    ({'temperature': ('warm',), 'humidity': ('average',)}, 'warm'),
+    ({'temperature': ('low',), 'humidity': ('low',)}, 'high'),
+    ({'temperature': ('low',), 'humidity': ('average',)}, 'warm'),
+]
+
+OUTPUT = 'temperature_adjustment'
+
+
+def build_skfuzzy_simulation():
+    # Reference scikit-fuzzy system built from the same definitions, used
+    # offline to cross-check the NumPy engine.
+    import skfuzzy as fuzz
+    from skfuzzy import control as ctrl
+
+    variables = {name: ctrl.Antecedent(UNIVERSES[name], name) for name in ('temperature', 'humidity')}
+    variables[OUTPUT] = ctrl.Consequent(UNIVERSES[OUTPUT], OUTPUT)
+    for name, terms in MEMBERSHIP_FUNCTIONS.items():
+        for label, abc in terms.items():
+            variables[name][label] = fuzz.trimf(variables[name].universe, abc)
+
+    rules = []
+    for antecedent, consequent in RULES:
+        condition = None
+        for name, labels in antecedent.items():
+            clause = variables[name][labels[0]]
+            for label in labels[1:]:
+                clause = clause | variables[name][label]
+            condition = clause if condition is None else condition & clause
+        rules.append(ctrl.Rule(condition, variables[OUTPUT][consequent]))
+
+    return ctrl.ControlSystemSimulation(ctrl.ControlSystem(rules))
+
 
 class TemperatureFuzzyController:
-    def __init__(self):
-        # Define fuzzy variables
-        self.temperature = ctrl.Antecedent(np.arange(25, 74, 1), 'temperature')
-        self.humidity = ctrl.Antecedent(np.arange(0, 91, 1), 'humidity')
-        self.temperature_adjustment = ctrl.Consequent(np.arange(25, 74, 1), 'temperature_adjustment')
-
-        # Membership functions
-        self.temperature['low'] = fuzz.trimf(self.temperature.universe, [25, 31, 36])
-        self.temperature['warm'] = fuzz.trimf(self.temperature.universe, [34, 43, 60])
-        self.temperature['high'] = fuzz.trimf(self.temperature.universe, [55, 70, 73])
-
-        self.humidity['low'] = fuzz.trimf(self.humidity.universe, [0, 30, 40])
-        self.humidity['average'] = fuzz.trimf(self.humidity.universe, [30, 50, 60])
-        self.humidity['high'] = fuzz.trimf(self.humidity.universe, [55, 60, 90])
-
-        self.temperature_adjustment['low'] = fuzz.trimf(self.temperature_adjustment.universe, [25, 31, 36])
-        self.temperature_adjustment['warm'] = fuzz.trimf(self.temperature_adjustment.universe, [34, 43, 60])
-        self.temperature_adjustment['high'] = fuzz.trimf(self.temperature_adjustment.universe, [55, 70, 73])
-
-        # Define fuzzy rules
-        rule1 = ctrl.Rule((self.temperature['high'] | self.temperature['warm'] | self.temperature['low']) & self.humidity['high'],
-                          self.temperature_adjustment['low'])
-        rule2 = ctrl.Rule(self.temperature['high'] & self.humidity['low'], self.temperature_adjustment['high'])
-        rule3 = ctrl.Rule(self.temperature['high'] & self.humidity['average'], self.temperature_adjustment['warm'])
-        rule4 = ctrl.Rule(self.temperature['warm'] & self.humidity['low'], self.temperature_adjustment['high'])
-        rule5 = ctrl.Rule(self.temperature['warm'] & self.humidity['average'], self.temperature_adjustment['warm'])
-        rule6 = ctrl.Rule(self.temperature['low'] & self.humidity['low'], self.temperature_adjustment['high'])
-        rule7 = ctrl.Rule(self.temperature['low'] & self.humidity['average'], self.temperature_adjustment['warm'])
-
-        # Control system
-        self.control_system = ctrl.ControlSystem([rule1, rule2, rule3, rule4, rule5, rule6, rule7])
-        self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+    def __init__(self, surface_resolution=None):
+        self.engine = MamdaniEngine(UNIVERSES, MEMBERSHIP_FUNCTIONS, RULES, OUTPUT)
 
         # Keep track of last successful output
         self.last_output = None
 
+        # Optional precomputed control surface (see build_surface)
+        self.surface = None
+        if surface_resolution is not None:
+            self.build_surface(surface_resolution)
+
+    def _simulate(self, temperature_value, humidity_value):
+        # Live evaluation; NaN where no rule fires
+        return self.engine.compute(temperature=temperature_value, humidity=humidity_value)
+
+    def cross_check(self, samples=2000, seed=0):
+        # Maximum difference between the NumPy engine and scikit-fuzzy
+        simulation = build_skfuzzy_simulation()
+        rng = np.random.default_rng(seed)
+        temps = rng.uniform(TEMPERATURE_RANGE[0], TEMPERATURE_RANGE[1], samples)
+        hums = rng.uniform(HUMIDITY_RANGE[0], HUMIDITY_RANGE[1], samples)
+        engine_values = self._simulate(temps, hums)
+
+        max_error = 0.0
+        mismatched = 0
+        for t, h, value in zip(temps, hums, engine_values):
+            try:
+                simulation.input['temperature'] = t
+                simulation.input['humidity'] = h
+                simulation.compute()
+                reference = simulation.output[OUTPUT]
+            except Exception:
+                reference = float('nan')
+            if np.isnan(reference) or np.isnan(value):
+                mismatched += np.isnan(reference) != np.isnan(value)
+                continue
+            max_error = max(max_error, abs(reference - value))
+        return {'points': samples, 'max_error': max_error, 'mismatched': int(mismatched)}
+
+    def build_surface(self, resolution=1.0):
+        # Evaluate the rule base once over the whole input grid so later
+        # queries are a bilinear interpolation instead of a full inference.
+        t_min, t_max = TEMPERATURE_RANGE
+        h_min, h_max = HUMIDITY_RANGE
+        t_steps = max(int(round((t_max - t_min) / resolution)), 1)
+        h_steps = max(int(round((h_max - h_min) / resolution)), 1)
+        self.surface_temperatures = np.linspace(t_min, t_max, t_steps + 1)
+        self.surface_humidities = np.linspace(h_min, h_max, h_steps + 1)
+        tt, hh = np.meshgrid(self.surface_temperatures, self.surface_humidities, indexing='ij')
+        surface = self._simulate(tt, hh)
+        self.surface_resolution = resolution
+        self.surface = surface
+        return surface
+
+    def _lookup_surface(self, temperature_value, humidity_value):
+        t_axis = self.surface_temperatures
+        h_axis = self.surface_humidities
+        if not (t_axis[0] <= temperature_value <= t_axis[-1] and h_axis[0] <= humidity_value <= h_axis[-1]):
+            return float('nan')
+
+        t_pos = (temperature_value - t_axis[0]) / (t_axis[1] - t_axis[0])
+        h_pos = (humidity_value - h_axis[0]) / (h_axis[1] - h_axis[0])
+        i = min(int(t_pos), len(t_axis) - 2)
+        j = min(int(h_pos), len(h_axis) - 2)
+        ft = t_pos - i
+        fh = h_pos - j
+
+        # Corners where the rule base has no output (the universe edges) are
+        # left out and the remaining weights renormalised.
+        s = self.surface
+        corners = ((s[i, j], (1 - ft) * (1 - fh)), (s[i, j + 1], (1 - ft) * fh),
+                   (s[i + 1, j], ft * (1 - fh)), (s[i + 1, j + 1], ft * fh))
+        total = 0.0
+        weight = 0.0
+        for value, w in corners:
+            if w > 0 and not math.isnan(value):
+                total += value * w
+                weight += w
+        if weight == 0:
+            return float('nan')
+        return total / weight
+
+    def surface_error(self, samples=2000, seed=0):
+        # Compare the interpolated surface with the live simulation at the
+        # centre of every grid cell plus random points, where bilinear error peaks.
+        if self.surface is None:
+            raise RuntimeError("Control surface has not been built")
+        t_axis = self.surface_temperatures
+        h_axis = self.surface_humidities
+        t_mid = (t_axis[:-1] + t_axis[1:]) / 2
+        h_mid = (h_axis[:-1] + h_axis[1:]) / 2
+        tt, hh = np.meshgrid(t_mid, h_mid, indexing='ij')
+        rng = np.random.default_rng(seed)
+        temps = np.concatenate([tt.ravel(), rng.uniform(t_axis[0], t_axis[-1], samples)])
+        hums = np.concatenate([hh.ravel(), rng.uniform(h_axis[0], h_axis[-1], samples)])
+
+        errors = []
+        mismatched = 0
+        for t, h, live in zip(temps, hums, self._simulate(temps, hums)):
+            approx = self._lookup_surface(t, h)
+            if np.isnan(live) or np.isnan(approx):
+                # Only disagreement on whether the rule base produces output counts
+                mismatched += np.isnan(live) != np.isnan(approx)
+                continue
+            errors.append(abs(live - approx))
+
+        errors = np.asarray(errors)
+        return {
+            'resolution': self.surface_resolution,
+            'points': len(temps),
+            'max_error': float(errors.max()) if errors.size else 0.0,
+            'mean_error': float(errors.mean()) if errors.size else 0.0,
+            'mismatched': int(mismatched),
+        }
+
     def compute_adjustment(self, temperature_value, humidity_value):
-        try:
-            self.simulation.input['temperature'] = temperature_value
-            self.simulation.input['humidity'] = humidity_value
-            self.simulation.compute()
-            self.last_output = self.simulation.output['temperature_adjustment']
-        except Exception as e:
-            print(f"[Warning] Fuzzy computation error: {e}")
+        if self.surface is not None:
+            value = self._lookup_surface(temperature_value, humidity_value)
+            if math.isnan(value):
+                print("[Warning] Fuzzy surface has no output for these inputs")
+                print("[Info] Using last known good adjustment value.")
+            else:
+                self.last_output = value
+            return self.last_output
+
+        value = self._simulate(temperature_value, humidity_value)
+        if math.isnan(value):
+            print("[Warning] Fuzzy computation error: no rule fired for these inputs")
             print("[Info] Using last known good adjustment value.")
+        else:
+            self.last_output = value
         return self.last_output
 
+    def compute_adjustments(self, temperature_values, humidity_values=None,
+                            temperature_column='T_Ave_Second', humidity_column='H_Ave'):
+        # Batch version of compute_adjustment for replaying logged runs.
+        # Accepts two arrays, or a DataFrame with the logged columns. Rows
+        # where no rule fires are flagged in no_output and take the last
+        # known good value in sequence, exactly as repeated single calls would.
+        # N-d inputs are filled in row-major order and keep their shape.
+        # The rule base is always evaluated exactly here, even in surface mode.
+        if humidity_values is None:
+            frame = temperature_values
+            temperature_values = frame[temperature_column]
+            humidity_values = frame[humidity_column]
+
+        temperatures, humidities = np.broadcast_arrays(np.atleast_1d(np.asarray(temperature_values, dtype=float)),
+                                                       np.atleast_1d(np.asarray(humidity_values, dtype=float)))
+        shape = temperatures.shape
+        raw = self._simulate(temperatures.ravel(), humidities.ravel())
+        no_output = np.isnan(raw)
+
+        # Forward fill from the last valid row, seeded with the current last_output
+        positions = np.where(no_output, -1, np.arange(raw.size))
+        np.maximum.accumulate(positions, out=positions)
+        seed = np.nan if self.last_output is None else self.last_output
+        adjustments = np.where(positions >= 0, raw[np.maximum(positions, 0)], seed)
+
+        if not no_output.all():
+            self.last_output = float(raw[~no_output][-1])
+        return adjustments.reshape(shape), no_output.reshape(shape)
+
 # Example usage:
 if __name__ == "__main__":
     fuzzy_ctrl = TemperatureFuzzyController()
@@ -59,3 +231,15 @@ if __name__ == "__main__":
         print(f"Input Temperature: {temp}")
         print(f"Input Humidity: {hum}")
         print(f"Calculated Temperature Adjustment: {adjustment:.2f}" if adjustment is not None else "No valid adjustment.")
+
+    adjustments, no_output = fuzzy_ctrl.compute_adjustments([t for t, _ in test_values], [h for _, h in test_values])
+    print(f"Batch adjustments: {adjustments}, no output: {no_output}")
+
+    report = fuzzy_ctrl.cross_check()
+    print(f"Engine vs scikit-fuzzy: max error {report['max_error']:.2e}, mismatched {report['mismatched']}")
+
+    for resolution in (2.0, 1.0, 0.5):
+        fuzzy_ctrl.build_surface(resolution)
+        report = fuzzy_ctrl.surface_error()
+        print(f"Surface resolution {resolution}: max error {report['max_error']:.3f}, "
+              f"mean error {report['mean_error']:.3f}, mismatched {report['mismatched']}")
@@ -1,7 +1,7 @@
 import sys
+import time
 import serial
 import threading
-import pandas as pd
 import serial.tools.list_ports
 from datetime import datetime
 from PyQt5 import QtWidgets, QtCore
@@ -11,6 +11,16 @@ from lcd_display_temperature import Ui_MainWindow as Ui_SecondWindow
 from lcd_display_temperature_drying import Ui_MainWindow as Ui_TempDryingWindow
 from lcd_display_humidity import Ui_MainWindow as Ui_ThirdWindow
 from calculate_emc import MoistureEstimator
+from data_logger import open_logger, export_excel
+from reading_store import ReadingStore
+from telemetry_parser import parse_telemetry, format_value, TelemetrySnapshot
+from binary_telemetry import BinaryFrame, FrameDemux
+from reading_history import ReadingHistory
+import resources
+
+# Columns of the per-run reading log, in firmware order
+LOG_FIELDS = ["T1", "T2", "T3", "T4", "T5", "T6", "T7", "T8", "H1", "H2",
+              "T_Ave_First", "T_Ave_Second", "H_Ave", "PWM_1", "PWM_2", "Timestamp"]
 
 
 def center_and_resize(window):
@@ -30,6 +40,7 @@ class ThirdWindow(QtWidgets.QMainWindow):
         self.first_window = first_window
         self.ui.pushButton_2.setEnabled(False)
         self.ui.pushButton.clicked.connect(self.go_to_temp_drying)
+        self.first_window.snapshot_ready.connect(self.show_snapshot)
         center_and_resize(self)
 
     def go_to_temp_drying(self):
@@ -38,11 +49,13 @@ class ThirdWindow(QtWidgets.QMainWindow):
         self.first_window.temp_drying_window.show()
         self.close()
 
-    @QtCore.pyqtSlot(str, str, str)
-    def update_humidity_labels(self, h1, h2, h_ave):
-        self.ui.label_6.setText(f"{h1} %")
-        self.ui.label_12.setText(f"{h2} %")
-        self.ui.label_8.setText(f"Average: {h_ave} %")
+    def show_snapshot(self, snapshot):
+        if not self.isVisible():
+            return
+        record = snapshot.record
+        self.ui.label_6.setText(f"{format_value(record.H1)} %")
+        self.ui.label_12.setText(f"{format_value(record.H2)} %")
+        self.ui.label_8.setText(f"Average: {format_value(record.h_ave)} %")
 
 
 class SecondWindow(QtWidgets.QMainWindow):
@@ -53,6 +66,7 @@ class SecondWindow(QtWidgets.QMainWindow):
         self.first_window = first_window
         self.ui.pushButton_2.clicked.connect(self.go_to_third)
         self.ui.pushButton.clicked.connect(self.go_to_first)
+        self.first_window.snapshot_ready.connect(self.show_snapshot)
         center_and_resize(self)
 
     def go_to_third(self):
@@ -65,13 +79,15 @@ class SecondWindow(QtWidgets.QMainWindow):
         self.first_window.show()
         self.close()
 
-    @QtCore.pyqtSlot(str, str, str, str, str)
-    def update_temperature_labels(self, t1, t2, t3, t4, t_ave_first):
-        self.ui.label.setText(f"{t1} °C")
-        self.ui.label_6.setText(f"{t2} °C")
-        self.ui.label_12.setText(f"{t3} °C")
-        self.ui.label_11.setText(f"{t4} °C")
-        self.ui.label_8.setText(f"Average: {t_ave_first} °C")
+    def show_snapshot(self, snapshot):
+        if not self.isVisible():
+            return
+        record = snapshot.record
+        self.ui.label.setText(f"{format_value(record.T1)} °C")
+        self.ui.label_6.setText(f"{format_value(record.T2)} °C")
+        self.ui.label_12.setText(f"{format_value(record.T3)} °C")
+        self.ui.label_11.setText(f"{format_value(record.T4)} °C")
+        self.ui.label_8.setText(f"Average: {format_value(record.t_ave_first)} °C")
 
 
 class TempDryingWindow(QtWidgets.QMainWindow):
@@ -82,6 +98,7 @@ class TempDryingWindow(QtWidgets.QMainWindow):
         self.first_window = first_window
         self.ui.pushButton.clicked.connect(self.go_to_second)
         self.ui.pushButton_2.clicked.connect(self.go_to_third)
+        self.first_window.snapshot_ready.connect(self.show_snapshot)
         center_and_resize(self)
 
     def go_to_second(self):
@@ -96,32 +113,49 @@ class TempDryingWindow(QtWidgets.QMainWindow):
         self.first_window.third_window.show()
         self.close()
 
-    @QtCore.pyqtSlot(str, str, str, str, str)
-    def update_temperature_labels(self, t5, t6, t7, t8, t_ave_2nd):
-        self.ui.label.setText(f"{t5} °C")
-        self.ui.label_6.setText(f"{t6} °C")
-        self.ui.label_12.setText(f"{t7} °C")
-        self.ui.label_11.setText(f"{t8} °C")
-        self.ui.label_8.setText(f"Average: {t_ave_2nd} °C")
+    def show_snapshot(self, snapshot):
+        if not self.isVisible():
+            return
+        record = snapshot.record
+        self.ui.label.setText(f"{format_value(record.T5)} °C")
+        self.ui.label_6.setText(f"{format_value(record.T6)} °C")
+        self.ui.label_12.setText(f"{format_value(record.T7)} °C")
+        self.ui.label_11.setText(f"{format_value(record.T8)} °C")
+        self.ui.label_8.setText(f"Average: {format_value(record.t_ave_2nd)} °C")
 
 
 class FirstWindow(QtWidgets.QMainWindow):
-    def __init__(self):
+    # Emitted from the serial thread, so delivery to each screen's
+    # show_snapshot is queued onto the GUI thread
+    snapshot_ready = QtCore.pyqtSignal(object)
+
+    def __init__(self, port=None):
         super().__init__()
         self.ui = Ui_FirstWindow()
         self.ui.setupUi(self)
         self.last_valid_drying_seconds = None
-        self.data_log = []
+        # Bounded typed history for charts and moving averages (12 h at 1 Hz)
+        self.history = ReadingHistory(capacity=43200)
+        # One log per run, so the workbook exported at the end of the batch
+        # holds only this batch
+        self.log_file = datetime.now().strftime("serial_readings_%Y%m%d_%H%M%S.csv")
         self.excel_file = "serial_readings.xlsx"
+        self.logger = open_logger(self.log_file, LOG_FIELDS)
+        self.store = ReadingStore()
 
         self.second_window = None
         self.third_window = None
         self.temp_drying_window = None
+        # Skips port discovery, e.g. for the pty of arduino_simulator.py
+        self.port = port
 
         self.ui.pushButton.clicked.connect(self.do_nothing)
         self.ui.pushButton_2.clicked.connect(self.go_to_second)
+        self.snapshot_ready.connect(self.show_snapshot)
         center_and_resize(self)
 
+        self.reading = threading.Event()
+        self.reading.set()
         self.serial_thread = threading.Thread(target=self.read_serial_data)
         self.serial_thread.daemon = True
         self.serial_thread.start()
@@ -129,6 +163,25 @@ class FirstWindow(QtWidgets.QMainWindow):
     def do_nothing(self):
         pass
 
+    def export_excel(self):
+        # Excel is written once from the append-only log, not per packet
+        self.logger.sync()
+        rows = export_excel(self.log_file, self.excel_file)
+        print(f"Exported {rows} readings to {self.excel_file}")
+
+    def closeEvent(self, event):
+        # Stop the read loop before closing what it writes to; readline
+        # times out after 1 s, plus the per-packet sleep
+        self.reading.clear()
+        self.serial_thread.join(timeout=3)
+        self.logger.close()
+        self.store.close()
+        try:
+            self.export_excel()
+        except Exception as e:
+            print("Error exporting Excel file:", e)
+        super().closeEvent(event)
+
     def go_to_second(self):
         if self.second_window is None:
             self.second_window = SecondWindow(self)
@@ -144,17 +197,20 @@ class FirstWindow(QtWidgets.QMainWindow):
 
     def read_serial_data(self):
         retries = 0
-        arduino_port = self.find_arduino_port()
+        arduino_port = self.port or self.find_arduino_port()
         self.arduino_port = arduino_port
 
         QtCore.QMetaObject.invokeMethod(self, "show_waiting_message", QtCore.Qt.QueuedConnection)
 
-        while self.arduino_port is None and retries < 30:
+        while self.arduino_port is None and retries < 30 and self.reading.is_set():
             QtCore.QThread.sleep(2)
             retries += 1
             self.arduino_port = self.find_arduino_port()
 
         QtCore.QMetaObject.invokeMethod(self, "handle_connection_result", QtCore.Qt.QueuedConnection)
+        if self.arduino_port is not None and self.reading.is_set():
+            # The blocking read loop stays on this thread, off the event loop
+            self.start_serial_reading(self.arduino_port)
 
     @QtCore.pyqtSlot()
     def show_waiting_message(self):
@@ -170,80 +226,67 @@ class FirstWindow(QtWidgets.QMainWindow):
             self.msg_box.close()
         if self.arduino_port is None:
             QtWidgets.QMessageBox.critical(self, "Error", "Arduino not found after 60 seconds.")
-        else:
-            self.start_serial_reading(self.arduino_port)
 
     def start_serial_reading(self, port):
         try:
             ser = serial.Serial(port, 9600, timeout=1)
+            # Binary frames (BINARY_TELEMETRY firmware) are picked out of the
+            # stream; text lines are joined up to the telemetry line
+            demux = FrameDemux()
             buffer = ""
-            while True:
-                line = ser.readline().decode(errors='ignore').strip()
-                if not line:
-                    continue
-
-                buffer += line + " "
-                if "pwm_2:" in buffer:
-                    parts = buffer.strip().split()
-                    buffer = ""
-
-                    if len(parts) < 15:
+            while self.reading.is_set():
+                for item in demux.feed(ser.read(ser.in_waiting or 1)):
+                    if not self.reading.is_set():
+                        break
+                    if isinstance(item, BinaryFrame):
+                        self.handle_record(item.record)
+                        continue
+                    line = str(item, 'utf-8', 'ignore').strip()
+                    if not line:
                         continue
 
-                    try:
-                        # Extract sensor values
-                        readings = {k: v.split(":")[1] for k, v in zip(
-                            ["T1", "T2", "T3", "T4", "T5", "T6", "T7", "T8", "H1", "H2", "T_Ave_First", "T_Ave_Second", "H_Ave", "PWM_1", "PWM_2"],
-                            parts[:15]
-                        )}
-                        # Update GUI
-                        QtCore.QMetaObject.invokeMethod(self, "update_labels", QtCore.Qt.QueuedConnection,
-                            QtCore.Q_ARG(str, readings["T_Ave_Second"]),
-                            QtCore.Q_ARG(str, readings["H_Ave"]),
-                            QtCore.Q_ARG(str, readings["PWM_2"]),
-                            QtCore.Q_ARG(str, readings["PWM_1"]))
-
-                        if self.second_window and self.second_window.isVisible():
-                            QtCore.QMetaObject.invokeMethod(self.second_window, "update_temperature_labels", QtCore.Qt.QueuedConnection,
-                                QtCore.Q_ARG(str, readings["T1"]), QtCore.Q_ARG(str, readings["T2"]),
-                                QtCore.Q_ARG(str, readings["T3"]), QtCore.Q_ARG(str, readings["T4"]),
-                                QtCore.Q_ARG(str, readings["T_Ave_First"]))
-
-                        if self.temp_drying_window and self.temp_drying_window.isVisible():
-                            QtCore.QMetaObject.invokeMethod(self.temp_drying_window, "update_temperature_labels", QtCore.Qt.QueuedConnection,
-                                QtCore.Q_ARG(str, readings["T5"]), QtCore.Q_ARG(str, readings["T6"]),
-                                QtCore.Q_ARG(str, readings["T7"]), QtCore.Q_ARG(str, readings["T8"]),
-                                QtCore.Q_ARG(str, readings["T_Ave_Second"]))
-
-                        if self.third_window and self.third_window.isVisible():
-                            QtCore.QMetaObject.invokeMethod(self.third_window, "update_humidity_labels", QtCore.Qt.QueuedConnection,
-                                QtCore.Q_ARG(str, readings["H1"]), QtCore.Q_ARG(str, readings["H2"]),
-                                QtCore.Q_ARG(str, readings["H_Ave"]))
-
-                        # Save data
-                        readings["Timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        self.data_log.append(readings)
-                        pd.DataFrame(self.data_log).to_excel(self.excel_file, index=False, engine='openpyxl')
-                        QtCore.QThread.sleep(1)
-
-                    except Exception as e:
-                        print("Error parsing serial data:", e)
+                    buffer += line + " "
+                    if "pwm_2:" in buffer:
+                        record = parse_telemetry(buffer)
+                        buffer = ""
+                        if record is not None:
+                            self.handle_record(record)
+            ser.close()
 
         except serial.SerialException as e:
             print("Serial error:", e)
 
-    @QtCore.pyqtSlot(str, str, str, str)
-    def update_labels(self, t_ave_2nd, h_ave, pwm_2, pwm_1):
-        self.ui.label.setText(f"{t_ave_2nd} °C")
-        self.ui.label_6.setText(f"{h_ave} %")
-        self.ui.label_12.setText(pwm_2)
-        self.ui.label_11.setText(pwm_1)
+    def handle_record(self, record):
+        try:
+            # Extract sensor values
+            readings = dict(zip(LOG_FIELDS, map(format_value, record)))
+            # Update GUI
+            timestamp = time.time()
+            self.snapshot_ready.emit(TelemetrySnapshot(record, timestamp, time.perf_counter()))
+
+            # Save data
+            readings["Timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.history.append(record, timestamp)
+            self.logger.append(readings)
+            self.store.append(record)
+            QtCore.QThread.sleep(1)
+
+        except Exception as e:
+            print("Error parsing serial data:", e)
+
+    def show_snapshot(self, snapshot):
+        record = snapshot.record
+        self.ui.label.setText(f"{format_value(record.t_ave_2nd)} °C")
+        self.ui.label_6.setText(f"{format_value(record.h_ave)} %")
+        self.ui.label_12.setText(format_value(record.pwm_2))
+        self.ui.label_11.setText(format_value(record.pwm_1))
 
         try:
-            temp = float(t_ave_2nd)
-            hum = float(h_ave)
-            estimator = MoistureEstimator(temp, hum)
+            estimator = MoistureEstimator(record.t_ave_2nd, record.h_ave)
             drying_time = estimator.get_drying_time_seconds()
+            if drying_time is None:
+                self.ui.label_8.setText("Dry Time: --")
+                return
             self.last_valid_drying_seconds = drying_time
             self.ui.label_8.setText(f"Dry Time: {drying_time} s")
         except Exception as e:
@@ -254,6 +297,8 @@ class FirstWindow(QtWidgets.QMainWindow):
 
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
-    window = FirstWindow()
+    # Icons from the prebuilt res.rcc (python resources.py)
+    resources.register()
+    window = FirstWindow(port=sys.argv[sys.argv.index('--port') + 1] if '--port' in sys.argv else None)
     window.show()
     sys.exit(app.exec_())
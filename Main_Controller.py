@@ -1,96 +1,248 @@
+import os
 import sys
 import time
 import signal
-from PyQt5.QtCore import QMetaObject, Qt, Q_ARG, pyqtSlot, QTimer, QThread, pyqtSignal, QObject
-from PyQt5 import QtWidgets
+from PyQt5.QtCore import QMetaObject, Qt, Q_ARG, pyqtSlot, QTimer, QThread, pyqtSignal, QObject, QIODevice
+from PyQt5 import QtGui, QtWidgets
 
 from FLC_MaizeDry import TemperatureFuzzyController
+import resources
 from lcd_display import Ui_MainWindow as Ui_FirstWindow
 from lcd_display_temperature import Ui_MainWindow as Ui_SecondWindow
 from lcd_display_temperature_drying import Ui_MainWindow as Ui_TempDryingWindow
 from lcd_display_humidity import Ui_MainWindow as Ui_ThirdWindow
-from calculate_emc import MoistureEstimator
+from calculate_emc import DryingTimeCache, format_eta
+from telemetry_stats import LatencyHistogram, LinkStats, format_link_stats
+from serial_framing import LineFramer
+from binary_telemetry import BinaryFrame, FrameDemux
+from telemetry_parser import parse_telemetry, TelemetrySnapshot
+from reading_store import ReadingStore
+from serial_capture import CaptureReplay, CaptureWriter
+from view_model import ViewModel
 
 import serial
 
 
 class SerialReader(QObject):
-    packet_ready = pyqtSignal(dict)
+    # Carries a TelemetrySnapshot by reference to every connected screen
+    packet_ready = pyqtSignal(object)
+    # What chunk_arrival measures, shown next to the latency histogram
+    ARRIVAL_CLOCK = "previous poll, upper bound incl. polling delay"
 
     def __init__(self, port='/dev/ttyUSB0', baud=9600):
         super().__init__()
-        self.serial = serial.Serial(port, baud, timeout=0.1)
-        self.buffer = b""
+        self.serial = self.open_port(port, baud)
+        self.framer = LineFramer()
+        # Binary frames are picked out of the stream; the rest is text
+        self.demux = FrameDemux(self.framer)
+        self.link = LinkStats()
+        # Sinks receiving every parsed record: append(record) / close()
+        self.recorders = []
+        # Sinks receiving every raw chunk before framing: write(data) / close()
+        self.taps = []
+        self.chunk_arrival = None
+        self.last_poll = None
+        self.last_packet_arrival = None
         self.packet_timer = QTimer()
         self.packet_timer.setSingleShot(True)
         self.packet_timer.setInterval(200)
         self.packet_timer.timeout.connect(self.emit_packet)
-        self.last_packet_data = {}
+        self.last_snapshot = None
         self.read_timer = QTimer()
         self.read_timer.timeout.connect(self.read_serial_data)
 
+    def open_port(self, port, baud):
+        return serial.Serial(port, baud, timeout=0.1)
+
+    def is_open(self):
+        return self.serial.is_open
+
+    def close(self):
+        self.read_timer.stop()
+        if self.is_open():
+            self.serial.close()
+        for recorder in self.recorders:
+            recorder.close()
+        self.recorders = []
+        for tap in self.taps:
+            tap.close()
+        self.taps = []
+
     def start(self):
-        if self.serial.is_open:
+        if self.is_open():
             print("[DEBUG] Serial port opened")
             self.read_timer.start(100)
         else:
             print("[ERROR] Failed to open serial port")
 
     def read_serial_data(self):
+        # Bytes read now arrived after the previous tick drained the port,
+        # so they are stamped with that tick: the latency then includes the
+        # polling delay instead of starting when the timer happened to fire
+        previous = self.last_poll
         try:
             data = self.serial.read(self.serial.in_waiting or 1)
+            self.last_poll = time.perf_counter()
             if data:
-                self.buffer += data
-                while b"\n" in self.buffer:
-                    line, self.buffer = self.buffer.split(b"\n", 1)
-                    self.process_line(line.decode(errors='ignore').strip())
+                self.feed(data, previous)
         except Exception as e:
             print("[ERROR] Serial read error:", e)
 
+    def feed(self, data, arrival=None):
+        self.chunk_arrival = time.perf_counter() if arrival is None else arrival
+        self.link.on_bytes(len(data), self.chunk_arrival)
+        for tap in self.taps:
+            tap.write(data)
+        for item in self.demux.feed(data):
+            if isinstance(item, BinaryFrame):
+                self.process_record(item.record, item.sequence)
+                continue
+            try:
+                line = str(item, 'utf-8')
+            except UnicodeDecodeError:
+                self.link.on_malformed('decode')
+                line = str(item, 'utf-8', 'ignore')
+            self.process_line(line.strip())
+
     def process_line(self, line):
-        if "pwm_2:" not in line:
+        record = parse_telemetry(line)
+        if record is None:
             return
-        parts = line.split()
-        parsed = {}
-        for part in parts:
-            if ':' in part:
-                k, v = part.split(':', 1)
-                parsed[k.strip()] = v.strip()
+        if not parse_telemetry.layout.match(line):
+            self.link.on_malformed('layout')
+        self.process_record(record)
+
+    def process_record(self, record, sequence=None):
+        self.link.on_packet(self.chunk_arrival, sequence)
+        for recorder in self.recorders:
+            recorder.append(record)
+        self.last_snapshot = TelemetrySnapshot(record, time.time(), self.chunk_arrival)
+        self.last_packet_arrival = self.chunk_arrival
+        if self.packet_timer.isActive():
+            # Replaces a packet that was never shown
+            self.link.on_coalesced()
+        else:
+            self.packet_timer.start()
+
+    def emit_packet(self):
+        self.link.on_emitted()
+        self.packet_ready.emit(self.last_snapshot)
+
+    def link_stats(self):
+        return self.link.snapshot(time.perf_counter(), crc=self.demux.crc_errors, overflow=self.framer.overflows)
+
+
+class QSerialReader(SerialReader):
+    # Event-driven backend: QSerialPort wakes the reader through readyRead
+    # only when bytes arrive, instead of polling every 100 ms.
+    ARRIVAL_CLOCK = "readyRead"
+
+    def open_port(self, port, baud):
+        # Only this backend needs the QtSerialPort module
+        from PyQt5.QtSerialPort import QSerialPort
+        serial_port = QSerialPort(port)
+        serial_port.setBaudRate(baud)
+        serial_port.readyRead.connect(self.read_serial_data)
+        if not serial_port.open(QIODevice.ReadOnly):
+            print("[ERROR] Serial error:", serial_port.errorString())
+        return serial_port
+
+    def is_open(self):
+        return self.serial.isOpen()
+
+    def start(self):
+        if self.is_open():
+            print("[DEBUG] Serial port opened")
+        else:
+            print("[ERROR] Failed to open serial port")
+
+    def read_serial_data(self):
         try:
-            data = {
-                'T': parsed.get("t_ave_2nd", "0"),
-                'H': parsed.get("h_ave", "0"),
-                'pwm2': parsed.get("pwm_2", "0"),
-                'pwm1': parsed.get("pwm_1", "0"),
-                'temps': [parsed.get(f"T{i+1}", "0") for i in range(4)],
-                'dry_temps': [parsed.get(f"T{i+5}", "0") for i in range(4)],
-                'hum': [parsed.get("H1", "0"), parsed.get("H2", "0")],
-                't_ave_first': parsed.get("t_ave_first", "0")
-            }
-            self.last_packet_data = data
-            if not self.packet_timer.isActive():
-                self.packet_timer.start()
+            data = bytes(self.serial.readAll())
+            if data:
+                self.feed(data)
         except Exception as e:
-            print("[ERROR] Parsing error:", e)
+            print("[ERROR] Serial read error:", e)
 
-    def emit_packet(self):
-        self.packet_ready.emit(self.last_packet_data)
+
+class ReplayReader(SerialReader):
+    # Feeds a raw capture (CaptureWriter output) back through the same
+    # framing and parsing path, at the recorded timing scaled by speed or,
+    # with speed None, as fast as the event loop allows.
+    ARRIVAL_CLOCK = "replayed chunk"
+
+    def open_port(self, port, baud):
+        return CaptureReplay(port)
+
+    def is_open(self):
+        return self.serial.is_open
+
+    def set_speed(self, speed):
+        self.serial.speed = speed
+
+    def start(self):
+        if self.is_open():
+            print("[DEBUG] Replay started")
+            self.read_timer.setSingleShot(True)
+            self.read_timer.start(int(self.serial.next_delay() * 1000))
+        else:
+            print("[ERROR] Nothing to replay")
+
+    def read_serial_data(self):
+        # Chunks due now are fed in one pass, up to 5 ms per pass so the
+        # screens stay responsive during as-fast-as-possible replay
+        deadline = time.perf_counter() + 0.005
+        while self.is_open():
+            self.feed(self.serial.read())
+            if self.serial.next_delay() > 0 or time.perf_counter() > deadline:
+                break
+        if self.is_open():
+            self.read_timer.start(int(self.serial.next_delay() * 1000))
+        else:
+            print("[DEBUG] Replay finished")
+
+
+READER_BACKENDS = {'poll': SerialReader, 'qt': QSerialReader, 'replay': ReplayReader}
+
+
+def open_run_archive(directory='runs'):
+    # Parquet history of every parsed reading; needs pyarrow
+    try:
+        from run_archive import RunArchiveWriter
+    except ImportError as e:
+        print("[WARNING] Run archive disabled:", e)
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return RunArchiveWriter(os.path.join(directory, time.strftime("run_%Y%m%d_%H%M%S")))
+
+
+def open_recorders():
+    recorders = [ReadingStore()]
+    archive = open_run_archive()
+    if archive is not None:
+        recorders.append(archive)
+    return recorders
 
 
 class ProcessingWorker(QObject):
     result_ready = pyqtSignal(str)
 
+    def __init__(self, quantum=0.1, cache_size=256):
+        super().__init__()
+        self.drying_time = DryingTimeCache(quantum, cache_size)
+
+    def cache_stats(self):
+        return self.drying_time.stats()
+
     @pyqtSlot(float, float)
     def process(self, t_ave_2nd, h_ave):
         try:
             print(f"[DEBUG] Processing ETA with: {t_ave_2nd} {h_ave}")
-            estimator = MoistureEstimator(t_ave_2nd, h_ave)
-            drying_seconds = estimator.get_drying_time_seconds()
-
-            minutes, seconds = divmod(int(drying_seconds), 60)
-            hours, minutes = divmod(minutes, 60)
-            eta_text = f"ETA: {hours}h {minutes}m"
+            drying_seconds = self.drying_time(t_ave_2nd, h_ave)
+            if drying_seconds is None:
+                print("[DEBUG] ETA result: target moisture unreachable")
 
+            eta_text = format_eta(drying_seconds)
             print(f"[DEBUG] ETA result: {eta_text}")
             self.result_ready.emit(eta_text)
         except Exception as e:
@@ -98,7 +250,54 @@ class ProcessingWorker(QObject):
             self.result_ready.emit("ETA: Error")
 
 
+class EtaScheduler(QObject):
+    # Latest-wins hand-off to the ProcessingWorker: at most one request in
+    # flight and one pending; a newer reading replaces the pending one.
+    def __init__(self, worker):
+        super().__init__()
+        self.worker = worker
+        self.worker.result_ready.connect(self.on_result)
+        self.in_flight = False
+        self.pending = None
+        self.submitted = 0
+        self.dispatched = 0
+        self.dropped = 0
+
+    def submit(self, t_ave_2nd, h_ave):
+        self.submitted += 1
+        if not self.in_flight:
+            self.dispatch(t_ave_2nd, h_ave)
+            return
+        if self.pending is not None:
+            self.dropped += 1
+        self.pending = (t_ave_2nd, h_ave)
+
+    def dispatch(self, t_ave_2nd, h_ave):
+        self.in_flight = True
+        self.dispatched += 1
+        QMetaObject.invokeMethod(self.worker, "process", Qt.QueuedConnection,
+                                 Q_ARG(float, t_ave_2nd), Q_ARG(float, h_ave))
+
+    @pyqtSlot(str)
+    def on_result(self, _result_text):
+        self.in_flight = False
+        if self.pending is not None:
+            t_ave_2nd, h_ave = self.pending
+            self.pending = None
+            self.dispatch(t_ave_2nd, h_ave)
+
+    def queue_depth(self):
+        return int(self.in_flight) + int(self.pending is not None)
+
+    def stats(self):
+        return {'submitted': self.submitted, 'dispatched': self.dispatched, 'dropped': self.dropped,
+                'queue_depth': self.queue_depth()}
+
+
 class ThirdWindow(QtWidgets.QMainWindow):
+    BINDINGS = {'H1': ('label_6', "{:.2f} %"), 'H2': ('label_12', "{:.2f} %"),
+                'h_ave': ('label_8', "Average: {:.2f} %")}
+
     def __init__(self, first_window):
         super().__init__()
         self.ui = Ui_ThirdWindow()
@@ -109,17 +308,13 @@ class ThirdWindow(QtWidgets.QMainWindow):
         self.ui.pushButton.clicked.connect(self.go_to_temp_drying)
 
     def go_to_temp_drying(self):
-        self.first_window.temp_drying_window.show()
-        self.close()
-
-    @pyqtSlot(str, str, str)
-    def update_humidity_labels(self, h1, h2, h_ave):
-        self.ui.label_6.setText(f"{h1} %")
-        self.ui.label_12.setText(f"{h2} %")
-        self.ui.label_8.setText(f"Average: {h_ave} %")
+        self.first_window.screens.show('temp_drying', self)
 
 
 class SecondWindow(QtWidgets.QMainWindow):
+    BINDINGS = {'T1': ('label', "{:.2f} °C"), 'T2': ('label_6', "{:.2f} °C"), 'T3': ('label_12', "{:.2f} °C"),
+                'T4': ('label_11', "{:.2f} °C"), 't_ave_first': ('label_8', "Average: {:.2f} °C")}
+
     def __init__(self, first_window):
         super().__init__()
         self.ui = Ui_SecondWindow()
@@ -131,23 +326,17 @@ class SecondWindow(QtWidgets.QMainWindow):
         self.ui.pushButton.clicked.connect(self.go_to_first)
 
     def go_to_third(self):
-        self.first_window.temp_drying_window.show()
-        self.close()
+        self.first_window.screens.show('temp_drying', self)
 
     def go_to_first(self):
         self.first_window.show()
         self.close()
 
-    @pyqtSlot(str, str, str, str, str)
-    def update_temperature_labels(self, t1, t2, t3, t4, t_ave_first):
-        self.ui.label.setText(f"{t1} °C")
-        self.ui.label_6.setText(f"{t2} °C")
-        self.ui.label_12.setText(f"{t3} °C")
-        self.ui.label_11.setText(f"{t4} °C")
-        self.ui.label_8.setText(f"Average: {t_ave_first} °C")
-
 
 class TempDryingWindow(QtWidgets.QMainWindow):
+    BINDINGS = {'T5': ('label', "{:.2f} °C"), 'T6': ('label_6', "{:.2f} °C"), 'T7': ('label_12', "{:.2f} °C"),
+                'T8': ('label_11', "{:.2f} °C"), 't_ave_2nd': ('label_8', "Average: {:.2f} °C")}
+
     def __init__(self, first_window):
         super().__init__()
         self.ui = Ui_TempDryingWindow()
@@ -159,31 +348,134 @@ class TempDryingWindow(QtWidgets.QMainWindow):
         self.ui.pushButton_2.clicked.connect(self.go_to_third)
 
     def go_to_second(self):
-        self.first_window.second_window.show()
-        self.close()
+        self.first_window.screens.show('second', self)
 
     def go_to_third(self):
-        self.first_window.third_window.show()
+        self.first_window.screens.show('third', self)
+
+
+class ScreenManager:
+    # Builds each secondary screen on first navigation and keeps it, so
+    # setupUi (pixmaps, stylesheets) runs once per screen and never before
+    # the first frame. prewarm() builds the rest one per event-loop pass.
+    def __init__(self, first_window, factories, on_built=None):
+        self.first_window = first_window
+        self.factories = factories
+        self.on_built = on_built
+        self.windows = {}
+        self.build_ms = {}
+        self.prewarm_queue = []
+
+    def get(self, name):
+        window = self.windows.get(name)
+        if window is None:
+            started = time.perf_counter()
+            window = self.windows[name] = self.factories[name](self.first_window)
+            self.build_ms[name] = (time.perf_counter() - started) * 1000
+            print(f"[DEBUG] Built {name} screen in {self.build_ms[name]:.1f} ms")
+            if self.on_built is not None:
+                self.on_built(name, window)
+        return window
+
+    def built(self):
+        return self.windows.items()
+
+    def show(self, name, current):
+        self.get(name).show()
+        current.close()
+
+    def prewarm(self):
+        self.prewarm_queue = [name for name in self.factories if name not in self.windows]
+        QTimer.singleShot(0, self._prewarm_next)
+
+    def _prewarm_next(self):
+        # One screen per pass keeps touch input responsive while warming
+        while self.prewarm_queue:
+            name = self.prewarm_queue.pop(0)
+            if name not in self.windows:
+                self.get(name)
+                break
+        if self.prewarm_queue:
+            QTimer.singleShot(0, self._prewarm_next)
+
+
+class DiagnosticsWindow(QtWidgets.QMainWindow):
+    # Hidden link diagnostics: five quick taps on the main screen
+    def __init__(self, first_window):
+        super().__init__()
+        self.first_window = first_window
+        self.setWindowTitle("Diagnostics")
+        self.resize(800, 480)
+        central = QtWidgets.QWidget(self)
+        layout = QtWidgets.QVBoxLayout(central)
+        self.text = QtWidgets.QPlainTextEdit(central)
+        self.text.setReadOnly(True)
+        self.text.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        layout.addWidget(self.text)
+        buttons = QtWidgets.QHBoxLayout()
+        reset_button = QtWidgets.QPushButton("Reset", central)
+        reset_button.clicked.connect(self.reset)
+        back_button = QtWidgets.QPushButton("Back", central)
+        back_button.clicked.connect(self.go_to_first)
+        buttons.addWidget(reset_button)
+        buttons.addWidget(back_button)
+        layout.addLayout(buttons)
+        self.setCentralWidget(central)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        first_window = self.first_window
+        latency = first_window.latency.summary()
+        self.text.setPlainText("\n".join([
+            format_link_stats(first_window.reader.link_stats()),
+            f"Frames: {first_window.reader.demux.frames} binary, {first_window.reader.framer.lines} text lines",
+            f"Packet to screen: p50 <={latency['p50_ms'] or 0:.0f} ms, p99 <={latency['p99_ms'] or 0:.0f} ms "
+            f"(from {first_window.reader.ARRIVAL_CLOCK})",
+            f"Label updates: {first_window.view_model.stats()}",
+            f"ETA requests: {first_window.eta_scheduler.stats()}",
+        ]))
+
+    def reset(self):
+        self.first_window.reader.link.reset()
+        self.refresh()
+
+    def go_to_first(self):
+        self.first_window.show()
         self.close()
 
-    @pyqtSlot(str, str, str, str, str)
-    def update_temperature_labels(self, t5, t6, t7, t8, t_ave_2nd):
-        self.ui.label.setText(f"{t5} °C")
-        self.ui.label_6.setText(f"{t6} °C")
-        self.ui.label_12.setText(f"{t7} °C")
-        self.ui.label_11.setText(f"{t8} °C")
-        self.ui.label_8.setText(f"Average: {t_ave_2nd} °C")
+
+SCREENS = {'second': SecondWindow, 'third': ThirdWindow, 'temp_drying': TempDryingWindow}
 
 
 class FirstWindow(QtWidgets.QMainWindow):
-    def __init__(self):
+    BINDINGS = {'t_ave_2nd': ('label', "{:.2f} °C"), 'h_ave': ('label_6', "{:.2f} %"),
+                'pwm_2': ('label_12', "{}"), 'pwm_1': ('label_11', "{}"), 'eta': ('label_8', "{}")}
+
+    def __init__(self, reader_backend='poll', prewarm=True, port='/dev/ttyUSB0', capture=None, replay_speed=1.0):
+        self.boot_started = time.perf_counter()
         super().__init__()
         self.ui = Ui_FirstWindow()
         self.ui.setupUi(self)
 
-        self.second_window = SecondWindow(self)
-        self.third_window = ThirdWindow(self)
-        self.temp_drying_window = TempDryingWindow(self)
+        self.screens = ScreenManager(self, SCREENS, on_built=self.on_screen_built)
+        self.prewarm_screens = prewarm
+        self.first_frame_ms = None
+        self.diagnostics_window = None
+        self.tap_times = []
+        self.view_model = ViewModel()
+        self.view_model.register(self, self.BINDINGS)
+        self.view_model.frame_done.connect(self.on_frame_done)
 
         self.ui.pushButton_2.clicked.connect(self.go_to_second)
         self.ui.pushButton.setEnabled(False)
@@ -193,61 +485,77 @@ class FirstWindow(QtWidgets.QMainWindow):
         self.worker.moveToThread(self.worker_thread)
         self.worker.result_ready.connect(self.on_drying_result)
         self.worker_thread.start()
-
-        self.reader = SerialReader()
+        self.eta_scheduler = EtaScheduler(self.worker)
+
+        # Byte arrival to label update, per reader backend
+        self.packet_arrival = None
+        self.latency = LatencyHistogram()
+
+        self.reader = READER_BACKENDS[reader_backend](port)
+        if reader_backend != 'replay':
+            # A replayed capture is an old run; recording it again would add
+            # a duplicate, wrongly dated run to the store and archive
+            self.reader.recorders = open_recorders()
+        if capture:
+            self.reader.taps.append(CaptureWriter(capture))
+        if reader_backend == 'replay':
+            self.reader.set_speed(replay_speed)
+        self.reader.packet_ready.connect(self.view_model.show_snapshot)
         self.reader.packet_ready.connect(self.on_packet)
         QTimer.singleShot(1000, self.reader.start)
 
-    def on_packet(self, data):
-        print("[DEBUG] Received:", data)
-
-        self.t_ave_first = data['t_ave_first']
-        self.h_ave = data['H']
-
-        QMetaObject.invokeMethod(self.second_window, "update_temperature_labels", Qt.QueuedConnection,
-            Q_ARG(str, data['temps'][0]), Q_ARG(str, data['temps'][1]), Q_ARG(str, data['temps'][2]),
-            Q_ARG(str, data['temps'][3]), Q_ARG(str, self.t_ave_first))
-
-        QMetaObject.invokeMethod(self.temp_drying_window, "update_temperature_labels", Qt.QueuedConnection,
-            Q_ARG(str, data['dry_temps'][0]), Q_ARG(str, data['dry_temps'][1]), Q_ARG(str, data['dry_temps'][2]),
-            Q_ARG(str, data['dry_temps'][3]), Q_ARG(str, data['T']))
-
-        QMetaObject.invokeMethod(self.third_window, "update_humidity_labels", Qt.QueuedConnection,
-            Q_ARG(str, data['hum'][0]), Q_ARG(str, data['hum'][1]), Q_ARG(str, self.h_ave))
-
-        QMetaObject.invokeMethod(self, "update_labels", Qt.QueuedConnection,
-            Q_ARG(str, data['T']), Q_ARG(str, self.h_ave), Q_ARG(str, data['pwm2']), Q_ARG(str, data['pwm1']))
-
-    @pyqtSlot(str, str, str, str)
-    def update_labels(self, t_ave_2nd, h_ave, pwm_2, pwm_1):
-        print(f"[DEBUG] update_labels() called with: {t_ave_2nd} {h_ave}")
-        self.ui.label.setText(f"{t_ave_2nd} °C")
-        self.ui.label_6.setText(f"{h_ave} %")
-        self.ui.label_12.setText(pwm_2)
-        self.ui.label_11.setText(pwm_1)
-
-        try:
-            t_val = float(t_ave_2nd)
-            h_val = float(h_ave)
-            QMetaObject.invokeMethod(self.worker, "process", Qt.QueuedConnection,
-                                     Q_ARG(float, float(t_val)),
-                                     Q_ARG(float, float(h_val)))
-        except Exception as e:
-            print(f"[ERROR] update_labels failed to start process: {e}")
-            self.ui.label_8.setText("ETA: Error")
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_frame_ms is None:
+            self.first_frame_ms = (time.perf_counter() - self.boot_started) * 1000
+            print(f"[DEBUG] First frame after {self.first_frame_ms:.1f} ms")
+            if self.prewarm_screens:
+                self.screens.prewarm()
+
+    def on_screen_built(self, name, window):
+        # Registered screens are filled from the latest values when shown
+        self.view_model.register(window, window.BINDINGS)
+
+    def on_packet(self, snapshot):
+        print("[DEBUG] Received:", snapshot.record)
+        if self.packet_arrival is None:
+            self.packet_arrival = snapshot.arrival
+        self.eta_scheduler.submit(snapshot.record.t_ave_2nd, snapshot.record.h_ave)
+
+    def on_frame_done(self):
+        if self.packet_arrival is not None:
+            self.latency.record(time.perf_counter() - self.packet_arrival)
+            self.packet_arrival = None
 
     @pyqtSlot(str)
     def on_drying_result(self, result_text):
         print(f"[DEBUG] on_drying_result(): {result_text}")
-        self.ui.label_8.setText(result_text)
+        self.view_model.update({'eta': result_text})
 
     def go_to_second(self):
-        self.second_window.show()
+        self.screens.get('second').show()
+        self.hide()
+
+    def mousePressEvent(self, event):
+        # Taps on the background (not the buttons) open diagnostics
+        now = time.monotonic()
+        self.tap_times = [tap for tap in self.tap_times if now - tap < 3.0] + [now]
+        if len(self.tap_times) >= 5:
+            self.tap_times = []
+            self.show_diagnostics()
+        super().mousePressEvent(event)
+
+    def show_diagnostics(self):
+        if self.diagnostics_window is None:
+            self.diagnostics_window = DiagnosticsWindow(self)
+        self.diagnostics_window.show()
         self.hide()
 
     def closeEvent(self, event):
-        if self.reader.serial.is_open:
-            self.reader.serial.close()
+        self.reader.close()
+        print(f"[DEBUG] Packet latency from {self.reader.ARRIVAL_CLOCK}:", self.latency.summary())
+        print("[DEBUG] Label updates:", self.view_model.stats())
+        print("[DEBUG] Link:", format_link_stats(self.reader.link_stats()))
         self.worker_thread.quit()
         self.worker_thread.wait()
         super().closeEvent(event)
@@ -256,6 +564,19 @@ class FirstWindow(QtWidgets.QMainWindow):
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal.SIG_DFL)
     app = QtWidgets.QApplication(sys.argv)
-    window = FirstWindow()
+    # Icons from the prebuilt res.rcc (python resources.py)
+    resources.register()
+
+    def option(name, default=None):
+        return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+    # --port lets the controller run against arduino_simulator.py;
+    # --capture PATH records the raw stream, --replay PATH plays one back
+    # (--replay-speed N, or max for as fast as possible)
+    backend = 'replay' if '--replay' in sys.argv else 'qt' if '--qt-serial' in sys.argv else 'poll'
+    speed = option('--replay-speed', '1')
+    window = FirstWindow(reader_backend=backend, prewarm='--no-prewarm' not in sys.argv,
+                         port=option('--replay') or option('--port', '/dev/ttyUSB0'),
+                         capture=option('--capture'), replay_speed=None if speed == 'max' else float(speed))
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,306 @@
+import argparse
+import math
+import os
+import random
+import select
+import threading
+import time
+import tty
+
+from binary_telemetry import encode_frame
+from telemetry_parser import parse_telemetry
+
+# Constants from buttonless_2_heater_parsing.ino
+PRINT_INTERVAL = 2.0
+LOW_PWM = 255 * 20 // 100
+MEDIUM_PWM = 255 * 60 // 100
+ADJ_ENABLE_HUMIDITY = 31.0
+ADJ_ENABLE_SECONDS = 15.0
+DRY_RGB = ((174, 180), (206, 212), (180, 187))
+
+
+def _fmt(value):
+    # Serial.print(float, 2): two decimals, "nan" for NaN
+    return "nan" if math.isnan(value) else f"{value:.2f}"
+
+
+class VirtualArduino:
+    # Stands in for the dryer Arduino on a pseudo-terminal: prints the
+    # exact lines of buttonless_2_heater_parsing.ino from a simple plenum
+    # and grain model and answers ADJ= commands. rate is a speed-up over
+    # the firmware's 2 s print interval (100 = one packet every 20 ms of
+    # wall time, simulated time advancing 2 s per packet). noise is the
+    # sensor standard deviation; drop_rate is the chance each byte is lost;
+    # garbage_rate the chance per packet of a burst of random bytes;
+    # nan_rate the chance a thermocouple reads NaN. baud, when set, paces
+    # writes like a real UART. binary sends the telemetry line as a
+    # binary_telemetry frame, like the firmware's BINARY_TELEMETRY mode.
+    # Bytes the host does not read in time are counted as overruns instead
+    # of blocking the simulator.
+    def __init__(self, rate=1.0, noise=0.2, drop_rate=0.0, garbage_rate=0.0, nan_rate=0.0, baud=None,
+                 dry_after=None, seed=None, link=None, binary=False):
+        self.rate = rate
+        self.noise = noise
+        self.drop_rate = drop_rate
+        self.garbage_rate = garbage_rate
+        self.nan_rate = nan_rate
+        self.baud = baud
+        self.dry_after = dry_after
+        self.random = random.Random(seed)
+        self.link = link
+        self.binary = binary
+        self.sequence = 0
+
+        # Only a stale symlink is replaced at link, never a real device or file
+        if link and os.path.lexists(link) and not os.path.islink(link):
+            raise FileExistsError(f"{link} exists and is not a symlink")
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.path = os.ttyname(self.slave)
+        if link:
+            if os.path.islink(link):
+                os.remove(link)
+            os.symlink(self.path, link)
+
+        # Simulated dryer state
+        self.clock = 0.0
+        self.ambient = 27.0
+        self.plenum = 28.0
+        self.humidity = 70.0
+        self.adjust_temperature = 0.0
+        self.adjustment_enabled = False
+        self.below_threshold_since = None
+        self.dry_announced = False
+        self.halted = False
+        self.command_buffer = b""
+
+        self.packets = 0
+        self.lines = 0
+        self.bytes_written = 0
+        self.bytes_dropped = 0
+        self.garbage = 0
+        self.overruns = 0
+        self.commands = 0
+        self.late = 0
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+        if self.link and os.path.islink(self.link):
+            os.remove(self.link)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def run(self):
+        interval = PRINT_INTERVAL / self.rate
+        started = time.monotonic()
+        next_packet = started
+        while self.running:
+            self.read_commands(max(next_packet - time.monotonic(), 0))
+            if not self.running:
+                break
+            if time.monotonic() < next_packet:
+                continue
+            if not self.halted:
+                self.step()
+            next_packet += interval
+            if next_packet < time.monotonic():
+                # The simulator itself could not keep up with the rate
+                self.late += 1
+                next_packet = time.monotonic()
+
+    def read_commands(self, timeout):
+        readable, _, _ = select.select([self.master], [], [], timeout)
+        if not readable:
+            return
+        try:
+            self.command_buffer += os.read(self.master, 1024)
+        except (BlockingIOError, OSError):
+            return
+        while b"\n" in self.command_buffer:
+            line, self.command_buffer = self.command_buffer.split(b"\n", 1)
+            self.handle_command(line.decode('ascii', 'ignore').strip())
+
+    def handle_command(self, command):
+        self.commands += 1
+        if not self.adjustment_enabled or not command.startswith("ADJ="):
+            return
+        try:
+            value = float(command[4:])
+        except ValueError:
+            value = 0.0   # String.toFloat() returns 0 for unparsable input
+        if 0.0 <= value <= 100.0:
+            self.adjust_temperature = value
+            self.write_lines([f"New adjust temperature set to: {value:.2f}"])
+        else:
+            self.write_lines(["Invalid ADJ value. Must be between 0.0 and 100.0"])
+
+    def step(self):
+        # One pass of the firmware loop, advancing simulated time by one
+        # print interval
+        self.clock += PRINT_INTERVAL
+        lines = []
+        dry = self.dry_after is not None and self.clock >= self.dry_after
+        if dry and not self.dry_announced:
+            self.dry_announced = True
+            self.halted = True
+            self.write_lines(["DRY"])
+            return
+
+        heating = self.update_model()
+        if self.humidity < ADJ_ENABLE_HUMIDITY and not self.adjustment_enabled:
+            if self.below_threshold_since is None:
+                self.below_threshold_since = self.clock
+            if self.clock - self.below_threshold_since > ADJ_ENABLE_SECONDS:
+                self.adjustment_enabled = True
+                lines.append("Humidity < 31% for 15 sec — switching to ADJ control.")
+        elif not self.adjustment_enabled:
+            self.below_threshold_since = None
+
+        packet = self.telemetry_lines()
+        if self.binary:
+            packet[-1] = encode_frame(parse_telemetry(packet[-1]), self.sequence)
+            self.sequence += 1
+        lines.extend(packet)
+        if heating:
+            lines.append("TRIAC phase control triggered")
+        self.write_lines(lines, packet=True)
+
+    def update_model(self):
+        drying = [self.plenum - 6.0 + offset for offset in (-0.6, -0.2, 0.2, 0.6)]
+        t_ave_first = sum(drying) / 4
+        heating = (not self.adjustment_enabled or self.humidity >= 53.0
+                   or t_ave_first < self.adjust_temperature)
+        target = self.ambient + (30.0 if heating else 0.0)
+        self.plenum += (target - self.plenum) * (1 - math.exp(-PRINT_INTERVAL / 300.0))
+        drying_rate = max(self.plenum - self.ambient, 0.0) / 30.0 / 7200.0
+        self.humidity += (18.0 - self.humidity) * (1 - math.exp(-PRINT_INTERVAL * drying_rate))
+        return heating
+
+    def sensor(self, value):
+        return value + self.random.gauss(0.0, self.noise) if self.noise else value
+
+    def thermocouple(self, value):
+        return math.nan if self.random.random() < self.nan_rate else self.sensor(value)
+
+    def telemetry_lines(self):
+        drying = [self.thermocouple(self.plenum - 6.0 + offset) for offset in (-0.6, -0.2, 0.2, 0.6)]
+        plenum = [self.thermocouple(self.plenum + offset) for offset in (-0.4, -0.1, 0.1, 0.4)]
+        temperatures = drying + plenum
+        h1, h2 = self.sensor(self.humidity - 1.0), self.sensor(self.humidity + 1.0)
+        h_ave = (h1 + h2) / 2.0
+
+        def average(values):
+            valid = [v for v in values if not math.isnan(v)]
+            return sum(valid) / len(valid) if valid else math.nan
+
+        pwm_1, pwm_2 = (MEDIUM_PWM, LOW_PWM) if h_ave >= 55.0 else (0, 95)
+        if self.dry_after is not None and self.clock >= self.dry_after - 60:
+            rgb = [self.random.randint(low, high) for low, high in DRY_RGB]
+        else:
+            rgb = [self.random.randint(140, 160), self.random.randint(170, 190), self.random.randint(150, 170)]
+        telemetry = "".join(f"T{i + 1}:{_fmt(value)} " for i, value in enumerate(temperatures))
+        telemetry += (f"H1:{_fmt(h1)} H2:{_fmt(h2)} t_ave_first:{_fmt(average(drying))} "
+                      f"t_ave_2nd:{_fmt(average(plenum))} h_ave:{_fmt(h_ave)} pwm_1:{pwm_1} pwm_2:{pwm_2}")
+        return [
+            f"RGB={rgb[0]},{rgb[1]},{rgb[2]}",
+            "Dry corn detected!" if self.dry_announced else "Not dry yet.",
+            f"Max31855: {_fmt(self.sensor(self.plenum + 2.0))}",
+            telemetry,
+        ]
+
+    def write_lines(self, lines, packet=False):
+        data = bytearray(b"".join(line if isinstance(line, bytes) else (line + "\r\n").encode('utf-8')
+                                 for line in lines))
+        self.lines += len(lines)
+        if packet:
+            self.packets += 1
+        if self.drop_rate:
+            kept = bytearray(byte for byte in data if self.random.random() >= self.drop_rate)
+            self.bytes_dropped += len(data) - len(kept)
+            data = kept
+        if self.garbage_rate and self.random.random() < self.garbage_rate:
+            burst = bytes(self.random.randrange(256) for _ in range(self.random.randint(1, 32)))
+            position = self.random.randint(0, len(data))
+            data[position:position] = burst
+            self.garbage += 1
+        self.write(bytes(data))
+
+    def write(self, data):
+        if self.baud:
+            # 10 bits per byte on the wire
+            chunk = max(int(self.baud / 10 * 0.01), 1)
+            for i in range(0, len(data), chunk):
+                self._write(data[i:i + chunk])
+                time.sleep(len(data[i:i + chunk]) * 10 / self.baud)
+        else:
+            self._write(data)
+
+    def _write(self, data):
+        try:
+            written = os.write(self.master, data)
+        except BlockingIOError:
+            written = 0
+        self.bytes_written += written
+        self.overruns += len(data) - written
+
+    def stats(self):
+        return {
+            'simulated_seconds': self.clock,
+            'packets': self.packets,
+            'lines': self.lines,
+            'bytes_written': self.bytes_written,
+            'bytes_dropped': self.bytes_dropped,
+            'garbage_bursts': self.garbage,
+            'overrun_bytes': self.overruns,
+            'commands': self.commands,
+            'late_packets': self.late,
+            'adjust_temperature': self.adjust_temperature,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Emulate the dryer Arduino on a pseudo-terminal")
+    parser.add_argument('--rate', type=float, default=1.0, help="Speed-up over the 2 s print interval")
+    parser.add_argument('--noise', type=float, default=0.2, help="Sensor noise standard deviation")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="Probability each byte is lost")
+    parser.add_argument('--garbage-rate', type=float, default=0.0, help="Probability per packet of random bytes")
+    parser.add_argument('--nan-rate', type=float, default=0.0, help="Probability a thermocouple reads NaN")
+    parser.add_argument('--baud', type=int, default=None, help="Pace output like a UART at this baud rate")
+    parser.add_argument('--dry-after', type=float, default=None, help="Simulated seconds until the corn is dry")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--link', default=None, help="Symlink to create for the pty, e.g. /tmp/ttyARDUINO")
+    parser.add_argument('--binary', action='store_true', help="Send telemetry as binary frames")
+    parser.add_argument('--stats-interval', type=float, default=10.0)
+    args = parser.parse_args()
+
+    simulator = VirtualArduino(args.rate, args.noise, args.drop_rate, args.garbage_rate, args.nan_rate, args.baud,
+                               args.dry_after, args.seed, args.link, args.binary)
+    print(f"[DEBUG] Virtual Arduino on {args.link or simulator.path}")
+    simulator.start()
+    try:
+        while True:
+            time.sleep(args.stats_interval)
+            print("[DEBUG] Simulator:", simulator.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        print("[DEBUG] Simulator:", simulator.stats())
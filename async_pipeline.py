@@ -0,0 +1,113 @@
+import asyncio
+import inspect
+import time
+
+
+class Stage:
+    # One pipeline step behind a bounded queue. offer() never blocks: when
+    # the queue is full the oldest waiting item is dropped and counted, so
+    # a slow stage sheds load instead of stalling the stages before it.
+    # Blocking work (disk, database) runs in a thread so it cannot stall
+    # the event loop that reads the serial port.
+    def __init__(self, name, func, maxsize=64, fan_out=False, blocking=False):
+        self.name = name
+        self.func = func
+        self.queue = asyncio.Queue(maxsize)
+        self.fan_out = fan_out
+        self.blocking = blocking
+        self.downstream = []
+        self.received = 0
+        self.processed = 0
+        self.emitted = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.busy = 0.0
+
+    def offer(self, item):
+        self.received += 1
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    async def run(self):
+        while True:
+            item = await self.queue.get()
+            started = time.perf_counter()
+            try:
+                if self.blocking:
+                    result = await asyncio.to_thread(self.func, item)
+                else:
+                    result = self.func(item)
+                    if inspect.isawaitable(result):
+                        result = await result
+            except Exception as e:
+                self.errors += 1
+                print(f"[ERROR] Pipeline stage {self.name} failed: {e}")
+                result = None
+            finally:
+                self.busy += time.perf_counter() - started
+                self.processed += 1
+                self.queue.task_done()
+
+            if result is None:
+                continue
+            for output in (result if self.fan_out else (result,)):
+                self.emitted += 1
+                for stage in self.downstream:
+                    stage.offer(output)
+
+    def stats(self, elapsed):
+        return {
+            'received': self.received,
+            'processed': self.processed,
+            'emitted': self.emitted,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'queue_depth': self.queue.qsize(),
+            'max_depth': self.max_depth,
+            'throughput': self.processed / elapsed if elapsed > 0 else 0.0,
+            'mean_ms': self.busy / self.processed * 1000 if self.processed else None,
+        }
+
+
+class Pipeline:
+    def __init__(self):
+        self.stages = []
+        self.tasks = []
+        self.started = None
+
+    def add(self, name, func, after=None, **options):
+        stage = Stage(name, func, **options)
+        for upstream in (after if isinstance(after, (list, tuple)) else [after] if after else []):
+            upstream.downstream.append(stage)
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        self.started = time.monotonic()
+        self.tasks = [asyncio.create_task(stage.run()) for stage in self.stages]
+
+    async def drain(self):
+        # Stages were added in flow order, so each join sees all upstream output
+        for stage in self.stages:
+            await stage.queue.join()
+
+    async def stop(self):
+        await self.drain()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started if self.started is not None else 0.0
+        return {stage.name: stage.stats(elapsed) for stage in self.stages}
+
+    def format_stats(self):
+        return " | ".join(
+            f"{name} {s['throughput']:.1f}/s q={s['queue_depth']} max={s['max_depth']} drop={s['dropped']}"
+            for name, s in self.stats().items())
@@ -0,0 +1,117 @@
+import binascii
+import math
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from serial_framing import LineFramer
+from telemetry_parser import TELEMETRY_SCHEMA, TelemetryRecord
+
+# Fixed-layout binary telemetry frame, 37 bytes instead of ~250 of text:
+#   sync  AA 55
+#   u8    frame version
+#   u16   sequence number (wraps)
+#   13 x float16  T1..T8, H1, H2, t_ave_first, t_ave_2nd, h_ave
+#   2 x int16     pwm_1, pwm_2 (-32768 when missing)
+#   u16   CRC-16/CCITT (poly 0x1021, init 0xFFFF) of everything after sync
+# All little-endian.
+FRAME_SYNC = b"\xaa\x55"
+FRAME_VERSION = 1
+_BODY = struct.Struct("<BH" + "".join('h' if converter is int else 'e' for _, converter in TELEMETRY_SCHEMA))
+_CRC = struct.Struct("<H")
+FRAME_SIZE = len(FRAME_SYNC) + _BODY.size + _CRC.size
+INT_MISSING = -32768
+_INT_FIELDS = [i for i, (_, converter) in enumerate(TELEMETRY_SCHEMA) if converter is int]
+
+FRAME_DTYPE = np.dtype(
+    [('sync', 'S2'), ('version', 'u1'), ('sequence', '<u2')] +
+    [(name, '<i2' if converter is int else '<f2') for name, converter in TELEMETRY_SCHEMA] +
+    [('crc', '<u2')])
+
+BinaryFrame = namedtuple('BinaryFrame', ['sequence', 'record'])
+
+
+def crc16(data):
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(record, sequence):
+    values = list(record)
+    for i in _INT_FIELDS:
+        if isinstance(values[i], float):
+            values[i] = INT_MISSING if math.isnan(values[i]) else int(values[i])
+    body = _BODY.pack(FRAME_VERSION, sequence & 0xFFFF, *values)
+    return FRAME_SYNC + body + _CRC.pack(crc16(body))
+
+
+def decode_frame(frame):
+    # BinaryFrame for one FRAME_SIZE buffer starting at the sync bytes, or
+    # None if the version or CRC does not match
+    body = bytes(frame[len(FRAME_SYNC):FRAME_SIZE - _CRC.size])
+    if _CRC.unpack_from(frame, FRAME_SIZE - _CRC.size)[0] != crc16(body):
+        return None
+    version, sequence, *values = _BODY.unpack(body)
+    if version != FRAME_VERSION:
+        return None
+    for i in _INT_FIELDS:
+        if values[i] == INT_MISSING:
+            values[i] = math.nan
+    return BinaryFrame(sequence, TelemetryRecord(*values))
+
+
+def decode_frames(data):
+    # Bulk decode of back-to-back frames (e.g. a binary-only log) into a
+    # structured array; frames with a bad sync, version or CRC are dropped
+    count = len(data) // FRAME_SIZE
+    frames = np.frombuffer(data, FRAME_DTYPE, count=count)
+    body = slice(len(FRAME_SYNC), FRAME_SIZE - _CRC.size)
+    valid = (frames['sync'] == FRAME_SYNC) & (frames['version'] == FRAME_VERSION)
+    valid &= np.fromiter((crc16(data[i * FRAME_SIZE:(i + 1) * FRAME_SIZE][body]) for i in range(count)),
+                         dtype='<u2', count=count) == frames['crc']
+    return frames[valid]
+
+
+class FrameDemux:
+    # Separates binary frames from text in one serial stream. Bytes outside
+    # frames go on to a LineFramer, so text lines and frames can be mixed
+    # freely; a chunk without the first sync byte takes the plain text path
+    # untouched. A sync pattern whose CRC fails is treated as text and the
+    # search resumes one byte later. feed() yields BinaryFrame objects and
+    # text lines (memoryviews valid until the next feed).
+    def __init__(self, framer=None):
+        self.framer = framer or LineFramer()
+        self.pending = b""
+        self.frames = 0
+        self.crc_errors = 0
+
+    def feed(self, data):
+        if not self.pending and FRAME_SYNC[:1] not in data:
+            yield from self.framer.feed(data)
+            return
+        buffer = self.pending + bytes(data)
+        self.pending = b""
+        start = 0
+        while True:
+            i = buffer.find(FRAME_SYNC, start)
+            if i < 0:
+                # A trailing first sync byte may start a frame in the next chunk
+                end = len(buffer) - 1 if len(buffer) > start and buffer.endswith(FRAME_SYNC[:1]) else len(buffer)
+                if end > start:
+                    yield from self.framer.feed(buffer[start:end])
+                self.pending = buffer[end:]
+                return
+            if i > start:
+                yield from self.framer.feed(buffer[start:i])
+            if len(buffer) - i < FRAME_SIZE:
+                self.pending = buffer[i:]
+                return
+            frame = decode_frame(buffer[i:i + FRAME_SIZE])
+            if frame is None:
+                self.crc_errors += 1
+                yield from self.framer.feed(buffer[i:i + 1])
+                start = i + 1
+            else:
+                self.frames += 1
+                yield frame
+                start = i + FRAME_SIZE
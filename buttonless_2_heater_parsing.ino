@@ -23,6 +23,12 @@ unsigned int r, g, b;
 #define S3 41
 #define sensorOut 42
 #include <TimerOne.h>
+#include <util/crc16.h>
+
+// 1: send the T/H/average/PWM line as a 37-byte binary frame instead of
+// text (layout in binary_telemetry.py); status lines stay text
+#define BINARY_TELEMETRY 0
+uint16_t frameSequence = 0;
 const int NUM_SAMPLES = 5;
 unsigned int redFrequency = 0;
 unsigned int greenFrequency = 0;
@@ -241,6 +247,47 @@ void fireTriac() {
 }
 
 
+// float -> IEEE half precision (truncating), NaN stays NaN
+uint16_t toHalf(float value) {
+  uint32_t bits;
+  memcpy(&bits, &value, sizeof(bits));
+  uint16_t sign = (bits >> 16) & 0x8000;
+  int16_t exponent = (int16_t)((bits >> 23) & 0xFF) - 127 + 15;
+  uint32_t mantissa = bits & 0x7FFFFF;
+  if (((bits >> 23) & 0xFF) == 0xFF) return sign | 0x7C00 | (mantissa ? 0x200 : 0);
+  if (exponent >= 31) return sign | 0x7C00;
+  if (exponent <= 0) {
+    if (exponent < -10) return sign;
+    return sign | ((mantissa | 0x800000) >> (14 - exponent));
+  }
+  return sign | (exponent << 10) | (mantissa >> 13);
+}
+
+void putUInt16(uint8_t *&p, uint16_t value) {
+  *p++ = value & 0xFF;
+  *p++ = value >> 8;
+}
+
+void sendTelemetryFrame() {
+  uint8_t frame[37];
+  uint8_t *p = frame;
+  *p++ = 0xAA; *p++ = 0x55;
+  *p++ = 1;  // frame version
+  putUInt16(p, frameSequence++);
+  for (int i = 0; i < 8; i++) putUInt16(p, toHalf(Temperatures[i]));
+  putUInt16(p, toHalf(H1));
+  putUInt16(p, toHalf(H2));
+  putUInt16(p, toHalf(averageTemp));
+  putUInt16(p, toHalf(averageTemp_Plenum));
+  putUInt16(p, toHalf(h_ave));
+  putUInt16(p, (uint16_t)pwm_1);
+  putUInt16(p, (uint16_t)pwm_2);
+  uint16_t crc = 0xFFFF;
+  for (uint8_t *q = frame + 2; q < p; q++) crc = _crc_xmodem_update(crc, *q);
+  putUInt16(p, crc);
+  Serial.write(frame, sizeof(frame));
+}
+
 void controlFan() {
   // Gate1 always at lowPWM
   analogWrite(Gate1, lowPWM);
@@ -423,6 +470,9 @@ void loop() {
     Serial.println(dryAnnounced ? "Dry corn detected!" : "Not dry yet.");
     Serial.print("Max31855: ");
     Serial.println(temperature);
+#if BINARY_TELEMETRY
+    sendTelemetryFrame();
+#else
     for (int i = 0; i < 8; i++) {
       Serial.print("T"); Serial.print(i + 1); Serial.print(":"); Serial.print(Temperatures[i], 2); Serial.print(" ");
     }
@@ -433,6 +483,7 @@ void loop() {
     Serial.print("h_ave:"); Serial.print(h_ave, 2); Serial.print(" ");
     Serial.print("pwm_1:"); Serial.print(pwm_1); Serial.print(" ");
     Serial.print("pwm_2:"); Serial.println(pwm_2);
+#endif
     delay(2000);  // previously 2000, now faster
   }
 
@@ -1,13 +1,27 @@
 import math
+from functools import lru_cache
+
+import numpy as np
+
+INITIAL_MOISTURE = 28  # Initial moisture content (%)
+C = 57.286
+N = 1.544
+K_BASE = 0.0002653
+TARGET_LOW = 13.0  # Target moisture band (%)
+TARGET_HIGH = 14.0
+
 
 class MoistureEstimator:
     def __init__(self, temperature, relative_humidity):
         self.temperature = temperature
         self.relative_humidity = relative_humidity
-        self.initial_moisture = 28  # Initial moisture content (%)
-        self.C = 57.286
-        self.N = 1.544
-        self.K_base = 0.0002653
+        self.initial_moisture = INITIAL_MOISTURE
+        self.C = C
+        self.N = N
+        self.K_base = K_BASE
+        self.target_low = TARGET_LOW
+        self.target_high = TARGET_HIGH
+        self.max_seconds = 10 ** 12  # Search limit for the bisection fallback
 
     def calculate_emc(self):
         rh_ratio = self.relative_humidity / 100
@@ -19,17 +33,164 @@ class MoistureEstimator:
         kelvin_temp = self.temperature + 273.15
         return self.K_base * math.exp(-1.544 / kelvin_temp)
 
+    def moisture_at(self, seconds, emc, k):
+        return self.initial_moisture * math.exp(-k * seconds) + emc * (1 - math.exp(-k * seconds))
+
     def get_drying_time_seconds(self):
+        # First whole second at which the moisture content lies within the
+        # target band, or None when the model never reaches it (EMC at or
+        # above the band, or the curve stepping over it).
         emc = self.calculate_emc()
         k = self.calculate_heat_constant()
 
-        A = 0
-        while True:
-            mc_t = self.initial_moisture * math.exp(-k * A) + emc * (1 - math.exp(-k * A))
-            if 13.0 <= mc_t <= 14.0:
-                return A  # total seconds
-            A += 1
+        if self.target_low <= self.initial_moisture <= self.target_high:
+            return 0
+        if k <= 0 or emc == self.initial_moisture:
+            return None
+
+        # The curve moves monotonically from initial_moisture towards emc
+        if self.initial_moisture > self.target_high:
+            if emc >= self.target_high:
+                return None
+            bound = self.target_high
+            crossed = lambda A: self.moisture_at(A, emc, k) <= bound
+        else:
+            if emc <= self.target_low:
+                return None
+            bound = self.target_low
+            crossed = lambda A: self.moisture_at(A, emc, k) >= bound
+
+        A = self._first_crossing(crossed, (self.initial_moisture - emc) / (bound - emc), k)
+        if A is None:
+            return None
+        mc_t = self.moisture_at(A, emc, k)
+        if self.target_low <= mc_t <= self.target_high:
+            return A
+        return None
+
+    def _first_crossing(self, crossed, ratio, k):
+        # Smallest integer A with crossed(A): closed form, corrected for
+        # rounding against the exact expression, bisection as a fallback.
+        try:
+            A = max(math.ceil(math.log(ratio) / k), 0)
+        except (ValueError, OverflowError):
+            A = None
+
+        if A is not None:
+            if crossed(A) and (A == 0 or not crossed(A - 1)):
+                return A
+            if not crossed(A) and crossed(A + 1):
+                return A + 1
+            if A > 0 and crossed(A - 1) and (A == 1 or not crossed(A - 2)):
+                return A - 1
+
+        high = 1
+        while not crossed(high):
+            high *= 2
+            if high > self.max_seconds:
+                return None
+        low = 0
+        while low < high:
+            mid = (low + high) // 2
+            if crossed(mid):
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+
+class DryingTimeCache:
+    # Drying time for (temperature, humidity) snapped to multiples of
+    # quantum, memoized in an LRU cache so near-identical readings share
+    # one estimate
+    def __init__(self, quantum=0.1, cache_size=256):
+        self.quantum = quantum
+        self.drying_seconds = lru_cache(maxsize=cache_size)(self.compute_drying_seconds)
+
+    def compute_drying_seconds(self, t_step, h_step):
+        estimator = MoistureEstimator(t_step * self.quantum, h_step * self.quantum)
+        return estimator.get_drying_time_seconds()
+
+    def __call__(self, temperature, relative_humidity):
+        # The firmware averages read NaN until their sensors are valid;
+        # there is no estimate for those, like an out-of-range reading
+        if not (math.isfinite(temperature) and math.isfinite(relative_humidity)):
+            return None
+        return self.drying_seconds(round(temperature / self.quantum), round(relative_humidity / self.quantum))
+
+    def stats(self):
+        info = self.drying_seconds.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize}
+
+
+def format_eta(drying_seconds):
+    if drying_seconds is None:
+        return "ETA: --"
+    minutes, seconds = divmod(int(drying_seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"ETA: {hours}h {minutes}m"
+
+
+# Array versions of the model above. They broadcast over NumPy arrays of
+# temperature and relative humidity, e.g. a day of logged readings or a
+# temperature x humidity grid, and return NaN where the scalar methods
+# would raise or return None.
+
+def calculate_emc_array(temperature, relative_humidity, K_base=K_BASE, C=C, N=N):
+    temperature = np.asarray(temperature, dtype=float)
+    rh_ratio = np.asarray(relative_humidity, dtype=float) / 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        numerator = -np.log(1 - rh_ratio)
+        denominator = K_base * (temperature + C)
+        return (numerator / denominator) ** (1 / N)
+
+
+def calculate_heat_constant_array(temperature, K_base=K_BASE):
+    kelvin_temp = np.asarray(temperature, dtype=float) + 273.15
+    return K_base * np.exp(-1.544 / kelvin_temp)
+
+
+def get_drying_time_seconds_array(temperature, relative_humidity, initial_moisture=INITIAL_MOISTURE,
+                                  K_base=K_BASE, target_low=TARGET_LOW, target_high=TARGET_HIGH):
+    emc = calculate_emc_array(temperature, relative_humidity, K_base)
+    k = calculate_heat_constant_array(temperature, K_base)
+    emc, k = np.broadcast_arrays(emc, k)
+
+    if target_low <= initial_moisture <= target_high:
+        return np.where(np.isnan(emc), np.nan, 0.0)
+
+    def moisture_at(seconds):
+        return initial_moisture * np.exp(-k * seconds) + emc * (1 - np.exp(-k * seconds))
+
+    if initial_moisture > target_high:
+        bound = target_high
+        reachable = emc < target_high
+        crossed = lambda A: moisture_at(A) <= bound
+    else:
+        bound = target_low
+        reachable = emc > target_low
+        crossed = lambda A: moisture_at(A) >= bound
+    reachable &= (k > 0) & np.isfinite(emc)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        A = np.ceil(np.log((initial_moisture - emc) / (bound - emc)) / k)
+        A = np.where(reachable & np.isfinite(A), np.maximum(A, 0), np.nan)
+
+        # Same rounding correction as MoistureEstimator._first_crossing
+        A = np.where(~crossed(A), A + 1, A)
+        step_back = (A > 0) & crossed(A - 1)
+        A = np.where(step_back, A - 1, A)
+
+        mc_t = moisture_at(A)
+        in_band = (target_low <= mc_t) & (mc_t <= target_high)
+    return np.where(in_band, A, np.nan)
+
+
+if __name__ == "__main__":
+    estimator = MoistureEstimator(temperature=28, relative_humidity=52.08)
+    total_seconds = estimator.get_drying_time_seconds()
+    print(f"Total drying time: {total_seconds} seconds" if total_seconds is not None else "Target moisture unreachable")
 
-estimator = MoistureEstimator(temperature=28, relative_humidity=52.08)
-total_seconds = estimator.get_drying_time_seconds()
-print(f"Total drying time: {total_seconds} seconds")
+    temps, hums = np.meshgrid(np.linspace(25, 73, 1000), np.linspace(0, 90, 1000), indexing='ij')
+    grid = get_drying_time_seconds_array(temps, hums)
+    print(f"Drying time grid: {np.isfinite(grid).sum()} of {grid.size} points reachable")
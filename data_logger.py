@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import os
+import threading
+import time
+
+
+class AppendOnlyLogger:
+    # Writes one reading per row in O(1): each row is flushed to the OS
+    # immediately and fsync'ed at most every fsync_interval seconds.
+    # serialize(row) returns the text of one row. header, when given, is
+    # written to a new file; an existing file that starts with a different
+    # header is rotated aside instead of being appended to.
+    def __init__(self, path, serialize, header=None, fsync_interval=10.0):
+        self.path = path
+        self.serialize = serialize
+        self.header = header
+        self.fsync_interval = fsync_interval
+        self.lock = threading.RLock()
+        self.rotated = None
+        if header is not None and _first_line(path) not in (None, header.rstrip("\r\n")):
+            self.rotated = f"{path}.{time.strftime('%Y%m%d_%H%M%S')}"
+            os.replace(path, self.rotated)
+            print(f"[DEBUG] {path} has a different header, moved to {self.rotated}")
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        if header is not None and self.file.tell() == 0:
+            self.file.write(header)
+            self.file.flush()
+        self.last_sync = time.monotonic()
+        self.rows = 0
+
+    def append(self, row):
+        with self.lock:
+            self.file.write(self.serialize(row))
+            self.rows += 1
+            self.file.flush()
+            if time.monotonic() - self.last_sync >= self.fsync_interval:
+                self.sync()
+
+    def sync(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.last_sync = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            self.sync()
+            self.file.close()
+
+
+def _first_line(path):
+    # None for a missing or empty file
+    try:
+        with open(path, newline='', encoding='utf-8', errors='replace') as f:
+            line = f.readline()
+    except FileNotFoundError:
+        return None
+    return line.rstrip("\r\n") if line else None
+
+
+def csv_format(fieldnames):
+    # (serialize, header) for CSV rows with a fixed column list
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+
+    def serialize(row):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        return buffer.getvalue()
+
+    return serialize, serialize(dict(zip(fieldnames, fieldnames)))
+
+
+def jsonl_format(fieldnames):
+    # JSON lines carry their own keys, so there is no header to check
+    return (lambda row: json.dumps({name: row.get(name) for name in fieldnames}) + "\n"), None
+
+
+LOGGER_FORMATS = {'.csv': csv_format, '.jsonl': jsonl_format}
+
+
+def open_logger(path, fieldnames, fsync_interval=10.0):
+    serialize, header = LOGGER_FORMATS[os.path.splitext(path)[1].lower()](fieldnames)
+    return AppendOnlyLogger(path, serialize, header, fsync_interval=fsync_interval)
+
+
+def export_excel(log_path, excel_path):
+    # On-demand conversion of a finished log to a workbook
+    import pandas as pd
+
+    if log_path.lower().endswith('.jsonl'):
+        frame = pd.read_json(log_path, lines=True, dtype=False)
+    else:
+        frame = pd.read_csv(log_path, dtype=str)
+    frame.to_excel(excel_path, index=False, engine='openpyxl')
+    return len(frame)
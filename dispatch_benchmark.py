@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QCoreApplication, QMetaObject, QObject, Qt, Q_ARG, pyqtSignal, pyqtSlot
+
+from telemetry_parser import TelemetrySnapshot, format_value, parse_telemetry
+
+LINE = ("T1:30.10 T2:30.20 T3:30.30 T4:30.40 T5:40.10 T6:40.20 T7:40.30 T8:40.40 "
+        "H1:50.00 H2:52.00 t_ave_first:30.25 t_ave_2nd:40.25 h_ave:51.00 pwm_1:120 pwm_2:200")
+
+
+class LegacyScreens(QObject):
+    # The four queued, name-looked-up slots a packet used to go through;
+    # the first one re-parses the strings for the ETA like update_labels did
+    @pyqtSlot(str, str, str, str)
+    def update_labels(self, t_ave_2nd, h_ave, pwm_2, pwm_1):
+        self.eta_input = (float(t_ave_2nd), float(h_ave))
+
+    @pyqtSlot(str, str, str, str, str)
+    def update_temperature_labels(self, t1, t2, t3, t4, t_ave):
+        self.temperatures = (t1, t2, t3, t4, t_ave)
+
+    @pyqtSlot(str, str, str)
+    def update_humidity_labels(self, h1, h2, h_ave):
+        self.humidity = (h1, h2, h_ave)
+
+
+class Screen(QObject):
+    def show_snapshot(self, snapshot):
+        self.snapshot = snapshot
+
+
+class Source(QObject):
+    packet_ready = pyqtSignal(object)
+
+
+def dispatch_legacy(receiver, record):
+    text = {name: format_value(value) for name, value in zip(record._fields, record)}
+    QMetaObject.invokeMethod(receiver, "update_temperature_labels", Qt.QueuedConnection,
+        Q_ARG(str, text['T1']), Q_ARG(str, text['T2']), Q_ARG(str, text['T3']),
+        Q_ARG(str, text['T4']), Q_ARG(str, text['t_ave_first']))
+    QMetaObject.invokeMethod(receiver, "update_temperature_labels", Qt.QueuedConnection,
+        Q_ARG(str, text['T5']), Q_ARG(str, text['T6']), Q_ARG(str, text['T7']),
+        Q_ARG(str, text['T8']), Q_ARG(str, text['t_ave_2nd']))
+    QMetaObject.invokeMethod(receiver, "update_humidity_labels", Qt.QueuedConnection,
+        Q_ARG(str, text['H1']), Q_ARG(str, text['H2']), Q_ARG(str, text['h_ave']))
+    QMetaObject.invokeMethod(receiver, "update_labels", Qt.QueuedConnection,
+        Q_ARG(str, text['t_ave_2nd']), Q_ARG(str, text['h_ave']), Q_ARG(str, text['pwm_2']),
+        Q_ARG(str, text['pwm_1']))
+
+
+def benchmark(packets=20000, batch=100, screens=4):
+    # Per-packet cost of formatting, queuing and delivering one packet to
+    # the screens, in microseconds (best of 3)
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    record = parse_telemetry(LINE)
+
+    legacy = LegacyScreens()
+    source = Source()
+    receivers = [Screen() for _ in range(screens)]
+    for receiver in receivers:
+        source.packet_ready.connect(receiver.show_snapshot, Qt.QueuedConnection)
+
+    def run(send):
+        best = float('inf')
+        for _ in range(3):
+            started = time.perf_counter()
+            for _ in range(packets // batch):
+                for _ in range(batch):
+                    send()
+                app.processEvents()
+            best = min(best, time.perf_counter() - started)
+        return best / packets * 1e6
+
+    return {
+        'string_invoke_us': run(lambda: dispatch_legacy(legacy, record)),
+        'snapshot_signal_us': run(
+            lambda: source.packet_ready.emit(TelemetrySnapshot(record, time.time(), time.perf_counter()))),
+    }
+
+
+if __name__ == "__main__":
+    for name, micros in benchmark().items():
+        print(f"{name}: {micros:.2f} us/packet")
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+class MamdaniEngine:
+    # Vectorized Mamdani inference matching scikit-fuzzy's ControlSystem:
+    # trimf memberships, max for OR, min for AND and implication, max
+    # aggregation and piecewise-linear centroid defuzzification.
+    def __init__(self, universes, membership_functions, rules, output, chunk_size=65536):
+        self.universes = {name: np.asarray(universe, dtype=float) for name, universe in universes.items()}
+        self.membership_functions = membership_functions
+        self.rules = rules
+        self.output = output
+        self.chunk_size = chunk_size
+
+        # Sampled membership functions, interpolated exactly like skfuzzy does
+        self.sampled = {
+            name: {label: trimf(self.universes[name], abc) for label, abc in terms.items()}
+            for name, terms in membership_functions.items()
+        }
+        self.output_labels = list(membership_functions[output])
+        abc = np.array([membership_functions[output][label] for label in self.output_labels], dtype=float)
+        self.output_a, self.output_b, self.output_c = abc[:, 0], abc[:, 1], abc[:, 2]
+
+    def compute(self, **inputs):
+        names = list(inputs)
+        values = np.broadcast_arrays(*[np.asarray(inputs[name], dtype=float) for name in names])
+        shape = values[0].shape
+        flat = [v.ravel() for v in values]
+
+        result = np.empty(flat[0].size)
+        for start in range(0, result.size, self.chunk_size):
+            stop = start + self.chunk_size
+            result[start:stop] = self._compute_flat({name: v[start:stop] for name, v in zip(names, flat)})
+
+        if shape == ():
+            return float(result[0])
+        return result.reshape(shape)
+
+    def _compute_flat(self, inputs):
+        invalid = np.zeros(len(next(iter(inputs.values()))), dtype=bool)
+        memberships = {}
+        for name, value in inputs.items():
+            universe = self.universes[name]
+            invalid |= np.isnan(value)
+            # skfuzzy clips inputs to the universe bounds
+            x = np.clip(value, universe[0], universe[-1])
+            memberships[name] = {label: np.interp(x, universe, mf) for label, mf in self.sampled[name].items()}
+
+        cuts = {label: np.zeros(invalid.shape) for label in self.output_labels}
+        for antecedent, consequent in self.rules:
+            strength = None
+            for name, labels in antecedent.items():
+                activation = memberships[name][labels[0]]
+                for label in labels[1:]:
+                    activation = np.fmax(activation, memberships[name][label])
+                strength = activation if strength is None else np.fmin(strength, activation)
+            cuts[consequent] = np.fmax(cuts[consequent], strength)
+
+        result = self._defuzz(np.stack([cuts[label] for label in self.output_labels], axis=1))
+        result[invalid] = np.nan
+        return result
+
+    def _defuzz(self, cuts):
+        # Upsample the output universe with the points where each clipped
+        # term crosses its cut level, as skfuzzy's find_memberships does, so
+        # the aggregated membership is piecewise linear between samples.
+        universe = self.universes[self.output]
+        left = self.output_a + cuts * (self.output_b - self.output_a)
+        right = self.output_c - cuts * (self.output_c - self.output_b)
+        xs = np.concatenate([np.broadcast_to(universe, (len(cuts), len(universe))), left, right], axis=1)
+        xs.sort(axis=1)
+
+        aggregated = np.zeros_like(xs)
+        for k, label in enumerate(self.output_labels):
+            mf = np.interp(xs, universe, self.sampled[self.output][label])
+            np.maximum(aggregated, np.minimum(cuts[:, k:k + 1], mf), out=aggregated)
+
+        x1, x2 = xs[:, :-1], xs[:, 1:]
+        y1, y2 = aggregated[:, :-1], aggregated[:, 1:]
+        width = x2 - x1
+        area = (width * (y1 + y2) / 2).sum(axis=1)
+        moment = (width * (y1 * (2 * x1 + x2) + y2 * (x1 + 2 * x2)) / 6).sum(axis=1)
+
+        result = np.full(len(cuts), np.nan)
+        np.divide(moment, area, out=result, where=area > 0)
+        return result
+
+
+def trimf(x, abc):
+    a, b, c = abc
+    x = np.asarray(x, dtype=float)
+    y = np.zeros_like(x)
+    if a != b:
+        idx = (a < x) & (x < b)
+        y[idx] = (x[idx] - a) / (b - a)
+    if b != c:
+        idx = (b < x) & (x < c)
+        y[idx] = (c - x[idx]) / (c - b)
+    y[x == b] = 1
+    return y
@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import math
+import signal
+import time
+
+import serial
+
+from async_pipeline import Pipeline
+from binary_telemetry import BinaryFrame, FrameDemux
+from calculate_emc import DryingTimeCache, format_eta
+from data_logger import open_logger
+from FLC_MaizeDry import TemperatureFuzzyController
+from serial_framing import LineFramer
+from telemetry_parser import TelemetryRecord, parse_telemetry
+
+LOG_FIELDS = list(TelemetryRecord._fields) + ['eta_seconds', 'adjustment', 'Timestamp']
+
+
+class Smoother:
+    # Exponential moving average that skips NaN readings
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, value):
+        if math.isnan(value):
+            return self.value if self.value is not None else value
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+        return self.value
+
+
+class HeadlessController:
+    # Serial -> framing -> parsing -> smoothing -> ETA -> fuzzy adjustment
+    # -> logging / publish, as an asyncio pipeline with bounded queues
+    # between stages, for dryers without a display. Framing and parsing run
+    # synchronously in the serial read callback: only whole parsed samples
+    # are queued, so a stage shedding load drops complete readings and
+    # never splices the halves of two lines together. Nothing here imports
+    # PyQt5 or res.py.
+    def __init__(self, port='/dev/ttyUSB0', baud=9600, log_path='serial_readings.csv', quantum=0.1,
+                 publish=None, stats_interval=60.0):
+        self.port = port
+        self.baud = baud
+        self.demux = FrameDemux(LineFramer())
+        self.temperature = Smoother()
+        self.humidity = Smoother()
+        self.drying_time = DryingTimeCache(quantum)
+        self.fuzzy_ctrl = TemperatureFuzzyController()
+        self.logger = open_logger(log_path, LOG_FIELDS)
+        self.publish_callback = publish or self.print_sample
+        self.stats_interval = stats_interval
+        self.serial = None
+        self.done = None
+
+        self.pipeline = Pipeline()
+        smoothing = self.pipeline.add('smoothing', self.smooth, maxsize=256)
+        eta = self.pipeline.add('eta', self.estimate, after=smoothing)
+        fuzzy = self.pipeline.add('fuzzy', self.adjust, after=eta)
+        self.pipeline.add('logging', self.log, after=fuzzy, maxsize=1024, blocking=True)
+        self.pipeline.add('publish', self.publish, after=fuzzy, maxsize=1)
+        self.source = smoothing
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self.done = loop.create_future()
+        self.serial = serial.Serial(self.port, self.baud, timeout=0)
+        print(f"[DEBUG] Serial port {self.port} opened")
+        self.pipeline.start()
+        reporter = asyncio.create_task(self.report_stats())
+        # Woken by the event loop only when bytes arrive
+        loop.add_reader(self.serial.fileno(), self.read_serial_data)
+        try:
+            await self.done
+        finally:
+            loop.remove_reader(self.serial.fileno())
+            self.serial.close()
+            reporter.cancel()
+            await self.pipeline.stop()
+            self.logger.close()
+            print("[DEBUG] Pipeline:", self.pipeline.format_stats())
+
+    def stop(self):
+        if self.done is not None and not self.done.done():
+            self.done.set_result(None)
+
+    async def report_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            print("[DEBUG] Pipeline:", self.pipeline.format_stats())
+
+    def read_serial_data(self):
+        try:
+            data = self.serial.read(self.serial.in_waiting or 1)
+        except serial.SerialException as e:
+            print("[ERROR] Serial read error:", e)
+            self.stop()
+            return
+        for item in self.frame(data):
+            sample = self.parse(item)
+            if sample is not None:
+                self.source.offer(sample)
+
+    def frame(self, data):
+        # Text lines as str, binary frames as BinaryFrame
+        return [item if isinstance(item, BinaryFrame) else str(item, 'utf-8', 'ignore').strip()
+                for item in self.demux.feed(data)]
+
+    def parse(self, item):
+        record = item.record if isinstance(item, BinaryFrame) else parse_telemetry(item)
+        if record is None:
+            return None
+        return {'record': record, 'timestamp': time.time()}
+
+    def smooth(self, sample):
+        sample['t_ave_2nd'] = self.temperature.update(sample['record'].t_ave_2nd)
+        sample['h_ave'] = self.humidity.update(sample['record'].h_ave)
+        return sample
+
+    def estimate(self, sample):
+        try:
+            sample['eta_seconds'] = self.drying_time(sample['t_ave_2nd'], sample['h_ave'])
+            sample['eta'] = format_eta(sample['eta_seconds'])
+        except Exception as e:
+            print(f"[ERROR] ETA calculation failed: {e}")
+            sample['eta_seconds'] = None
+            sample['eta'] = "ETA: Error"
+        return sample
+
+    def adjust(self, sample):
+        sample['adjustment'] = self.fuzzy_ctrl.compute_adjustment(sample['t_ave_2nd'], sample['h_ave'])
+        return sample
+
+    def log(self, sample):
+        row = sample['record']._asdict()
+        row['eta_seconds'] = sample['eta_seconds']
+        row['adjustment'] = sample['adjustment']
+        row['Timestamp'] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sample['timestamp']))
+        self.logger.append(row)
+
+    def publish(self, sample):
+        self.publish_callback(sample)
+
+    def print_sample(self, sample):
+        text = f"[DEBUG] {sample['t_ave_2nd']:.2f} °C {sample['h_ave']:.2f} % {sample['eta']}"
+        if sample['adjustment'] is not None:
+            text += f" ADJ={sample['adjustment']:.2f}"
+        print(text)
+
+
+async def main(args):
+    controller = HeadlessController(args.port, args.baud, args.log, args.quantum, stats_interval=args.stats_interval)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, controller.stop)
+    await controller.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the dryer controller without a display")
+    parser.add_argument('--port', default='/dev/ttyUSB0')
+    parser.add_argument('--baud', type=int, default=9600)
+    parser.add_argument('--log', default='serial_readings.csv', help="CSV or .jsonl reading log")
+    parser.add_argument('--quantum', type=float, default=0.1, help="ETA cache quantum")
+    parser.add_argument('--stats-interval', type=float, default=60.0, help="Seconds between pipeline stats")
+    asyncio.run(main(parser.parse_args()))
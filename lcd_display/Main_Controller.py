@@ -7,6 +7,7 @@ from lcd_display import Ui_MainWindow as Ui_FirstWindow
 from lcd_display_temperature import Ui_MainWindow as Ui_SecondWindow
 from lcd_display_temperature_drying import Ui_MainWindow as Ui_TempDryingWindow
 from lcd_display_humidity import Ui_MainWindow as Ui_ThirdWindow
+import res
 
 class ThirdWindow(QtWidgets.QMainWindow):
     def __init__(self, first_window):
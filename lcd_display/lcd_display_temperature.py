@@ -9,7 +9,7 @@
 
 
 from PyQt5 import QtCore, QtGui, QtWidgets
-import sys,res
+import sys
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
@@ -211,6 +211,7 @@ class Ui_MainWindow(object):
 
 
 if __name__ == "__main__":
+    import res
     import sys
     app = QtWidgets.QApplication(sys.argv)
     MainWindow = QtWidgets.QMainWindow()
@@ -9,7 +9,7 @@
 
 
 from PyQt5 import QtCore, QtGui, QtWidgets
-import sys,res
+import sys
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
@@ -210,6 +210,7 @@ class Ui_MainWindow(object):
         self.label_8.setText(_translate("MainWindow", "Average: Average"))
 
 if __name__ == "__main__":
+    import res
     app = QtWidgets.QApplication(sys.argv)
     MainWindow = QtWidgets.QMainWindow()
     ui = Ui_MainWindow()
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+# The generated UI modules sit in lcd_display/ in the source tree
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lcd_display'))
+
+from PyQt5.QtCore import QCoreApplication
+
+from calculate_emc import DryingTimeCache, MoistureEstimator
+from data_logger import open_logger
+from FLC_MaizeDry import TemperatureFuzzyController
+from serial_framing import LineFramer
+from telemetry_parser import TelemetryRecord, parse_telemetry
+
+
+def synthetic_lines(packets, seed=0):
+    # A run of firmware output from the simulator's dryer model, generated
+    # directly; its pty is opened but never written to or read
+    from arduino_simulator import VirtualArduino
+    simulator = VirtualArduino(seed=seed)
+    try:
+        lines = []
+        for _ in range(packets):
+            simulator.clock += 2.0
+            simulator.update_model()
+            lines.extend(simulator.telemetry_lines())
+            lines.append("TRIAC phase control triggered")
+        return lines
+    finally:
+        simulator.stop()
+
+
+def recorded_lines(path):
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def measure(name, func, items, allocations=True):
+    # Per-item latency, throughput, and allocations (tracemalloc on a
+    # second pass so it does not distort the timings)
+    timings = []
+    clock = time.perf_counter_ns
+    started = clock()
+    for item in items:
+        t0 = clock()
+        func(item)
+        timings.append(clock() - t0)
+    elapsed = (clock() - started) / 1e9
+    timings.sort()
+
+    result = {
+        'items': len(items),
+        'throughput_per_s': len(items) / elapsed if elapsed else None,
+        'mean_us': sum(timings) / len(timings) / 1000,
+        'p50_us': timings[len(timings) // 2] / 1000,
+        'p99_us': timings[min(int(len(timings) * 0.99), len(timings) - 1)] / 1000,
+        'max_us': timings[-1] / 1000,
+    }
+    if allocations:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        for item in items:
+            func(item)
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+        result['alloc_peak_kb'] = peak / 1024
+        result['retained_blocks'] = blocks
+    print(f"[DEBUG] {name}: {result['throughput_per_s']:.0f}/s p50 {result['p50_us']:.1f} us "
+          f"p99 {result['p99_us']:.1f} us")
+    return result
+
+
+def run(lines, chunk_size=64):
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    from Main_Controller import SerialReader
+
+    class BenchmarkReader(SerialReader):
+        # Bytes come from the benchmark, not a port
+        def open_port(self, port, baud):
+            return None
+
+        def is_open(self):
+            return False
+
+    records = [record for record in map(parse_telemetry, lines) if record is not None]
+    points = [(record.t_ave_2nd, record.h_ave) for record in records]
+    stream = "".join(line + "\r\n" for line in lines).encode('utf-8')
+    results = {}
+
+    framer = LineFramer()
+    results['framing'] = measure('framing', lambda chunk: sum(1 for _ in framer.feed(chunk)),
+                                 chunked(stream, chunk_size))
+    results['framing']['lines'] = framer.lines
+
+    reader = BenchmarkReader()
+    results['parsing'] = measure('parsing', reader.process_line, lines)
+    reader.packet_timer.stop()
+
+    reader = BenchmarkReader()
+    results['read_to_packet'] = measure('read_to_packet', reader.feed, chunked(stream, chunk_size))
+    reader.packet_timer.stop()
+
+    results['eta'] = measure('eta', lambda p: MoistureEstimator(*p).get_drying_time_seconds(), points)
+    cache = DryingTimeCache()
+    results['eta_cached'] = measure('eta_cached', lambda p: cache(*p), points)
+    results['eta_cached']['cache'] = cache.stats()
+
+    controller = TemperatureFuzzyController()
+    results['fuzzy'] = measure('fuzzy', lambda p: controller.compute_adjustment(*p), points)
+    controller = TemperatureFuzzyController(surface_resolution=0.5)
+    results['fuzzy_surface'] = measure('fuzzy_surface', lambda p: controller.compute_adjustment(*p), points)
+
+    with tempfile.TemporaryDirectory() as directory:
+        logger = open_logger(os.path.join(directory, 'bench.csv'), TelemetryRecord._fields)
+        rows = [record._asdict() for record in records]
+        results['logging'] = measure('logging', logger.append, rows)
+        logger.close()
+
+    app.processEvents()
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': sys.version.split()[0], 'platform': platform.platform(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(results, baseline):
+    # Ratio of mean latency against an earlier JSON result, per stage
+    for stage, result in results.items():
+        old = baseline.get('stages', {}).get(stage)
+        if old and old.get('mean_us'):
+            ratio = result['mean_us'] / old['mean_us']
+            flag = "  <-- slower" if ratio > 1.1 else ""
+            print(f"{stage}: {old['mean_us']:.1f} -> {result['mean_us']:.1f} us ({ratio:.2f}x){flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the serial-to-screen pipeline stages")
+    parser.add_argument('--input', help="Recorded serial text to replay instead of synthetic telemetry")
+    parser.add_argument('--packets', type=int, default=2000, help="Synthetic packets to generate")
+    parser.add_argument('--chunk-size', type=int, default=64, help="Bytes per simulated serial read")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    lines = recorded_lines(args.input) if args.input else synthetic_lines(args.packets)
+    report = {'environment': environment(), 'input': args.input or f"synthetic:{args.packets}",
+              'stages': run(lines, args.chunk_size)}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[DEBUG] Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report['stages'], json.load(f))
@@ -0,0 +1,62 @@
+import numpy as np
+
+from telemetry_parser import TELEMETRY_SCHEMA
+
+HISTORY_COLUMNS = [name for name, _ in TELEMETRY_SCHEMA]
+
+
+class ReadingHistory:
+    # Fixed-capacity history of typed readings: one float32 column per
+    # sensor plus a float64 epoch timestamp column. Every sample is written
+    # twice, at i and i + capacity, so the latest n samples are always one
+    # contiguous slice and windows are views rather than copies.
+    def __init__(self, capacity=43200, columns=HISTORY_COLUMNS):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.index = {name: i for i, name in enumerate(self.columns)}
+        self.values = np.full((len(self.columns), 2 * capacity), np.nan, dtype=np.float32)
+        self.timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self.head = 0      # next write position in [0, capacity)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, record, timestamp):
+        i = self.head
+        self.values[:, i] = record
+        self.values[:, i + self.capacity] = record
+        self.timestamps[i] = self.timestamps[i + self.capacity] = timestamp
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def _span(self, count):
+        count = self.size if count is None else min(count, self.size)
+        end = self.head + self.capacity if self.size == self.capacity else self.head
+        return end - count, end
+
+    def window(self, column, count=None):
+        # View of the latest count samples of one column, oldest first
+        start, end = self._span(count)
+        return self.values[self.index[column], start:end]
+
+    def timestamp_window(self, count=None):
+        start, end = self._span(count)
+        return self.timestamps[start:end]
+
+    def latest(self):
+        if not self.size:
+            return None
+        start, end = self._span(1)
+        return dict(zip(self.columns, self.values[:, start].tolist()))
+
+    def moving_average(self, column, width, count=None):
+        # Trailing mean over width samples for the latest count samples
+        data = self.window(column, count).astype(np.float64)
+        if len(data) < width:
+            return np.empty(0)
+        cumulative = np.cumsum(np.insert(data, 0, 0.0))
+        return (cumulative[width:] - cumulative[:-width]) / width
+
+    def memory_footprint(self):
+        return self.values.nbytes + self.timestamps.nbytes
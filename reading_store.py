@@ -0,0 +1,145 @@
+import queue
+import sqlite3
+import threading
+import time
+
+from telemetry_parser import TELEMETRY_SCHEMA
+
+READING_COLUMNS = [name for name, _ in TELEMETRY_SCHEMA]
+ROLLUP_COLUMNS = ['t_ave_first', 't_ave_2nd', 'h_ave']
+ROLLUPS = {'1m': 60, '10m': 600}
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS readings (run_id TEXT NOT NULL, timestamp REAL NOT NULL, " +
+    ", ".join(f"{name} {'INTEGER' if converter is int else 'REAL'}" for name, converter in TELEMETRY_SCHEMA) + ")",
+    "CREATE INDEX IF NOT EXISTS readings_run_time ON readings (run_id, timestamp)",
+    "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, started REAL, ended REAL, readings INTEGER, " +
+    ", ".join(f"max_{name} REAL, min_{name} REAL" for name in ROLLUP_COLUMNS) + ")",
+] + [
+    f"CREATE TABLE IF NOT EXISTS rollup_{label} (run_id TEXT NOT NULL, bucket INTEGER NOT NULL, readings INTEGER, " +
+    ", ".join(f"{name}_sum REAL, {name}_count INTEGER, {name}_min REAL, {name}_max REAL" for name in ROLLUP_COLUMNS) +
+    ", PRIMARY KEY (run_id, bucket))"
+    for label in ROLLUPS
+]
+
+
+def _rollup_sql(label, seconds):
+    aggregates = ", ".join(f"SUM({name}), COUNT({name}), MIN({name}), MAX({name})" for name in ROLLUP_COLUMNS)
+    updates = ", ".join(
+        f"{name}_sum = COALESCE({name}_sum, 0) + COALESCE(excluded.{name}_sum, 0), "
+        f"{name}_count = {name}_count + excluded.{name}_count, "
+        f"{name}_min = MIN(COALESCE({name}_min, excluded.{name}_min), COALESCE(excluded.{name}_min, {name}_min)), "
+        f"{name}_max = MAX(COALESCE({name}_max, excluded.{name}_max), COALESCE(excluded.{name}_max, {name}_max))"
+        for name in ROLLUP_COLUMNS)
+    return (f"INSERT INTO rollup_{label} SELECT run_id, CAST(timestamp / {seconds} AS INTEGER) * {seconds}, "
+            f"COUNT(*), {aggregates} FROM readings WHERE rowid > ? GROUP BY run_id, 2 "
+            f"ON CONFLICT (run_id, bucket) DO UPDATE SET readings = readings + excluded.readings, {updates}")
+
+
+def _runs_sql():
+    aggregates = ", ".join(f"MAX({name}), MIN({name})" for name in ROLLUP_COLUMNS)
+    updates = ", ".join(
+        f"max_{name} = MAX(COALESCE(max_{name}, excluded.max_{name}), COALESCE(excluded.max_{name}, max_{name})), "
+        f"min_{name} = MIN(COALESCE(min_{name}, excluded.min_{name}), COALESCE(excluded.min_{name}, min_{name}))"
+        for name in ROLLUP_COLUMNS)
+    return (f"INSERT INTO runs SELECT run_id, MIN(timestamp), MAX(timestamp), COUNT(*), {aggregates} "
+            f"FROM readings WHERE rowid > ? GROUP BY run_id "
+            f"ON CONFLICT (run_id) DO UPDATE SET ended = MAX(ended, excluded.ended), "
+            f"readings = readings + excluded.readings, {updates}")
+
+
+def connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ReadingStore:
+    # SQLite time-series store. append() only queues the reading; a
+    # background thread inserts batches in one transaction each and folds
+    # them into the per-run summary and the 1 min / 10 min rollups.
+    def __init__(self, path='readings.db', run_id=None, batch_size=100, flush_interval=1.0, max_queue=10000):
+        self.path = path
+        self.run_id = run_id or time.strftime("%Y%m%d_%H%M%S")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.inserted = 0
+        self.dropped = 0
+
+        with connect(path) as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+        connection.close()
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def append(self, record, timestamp=None):
+        row = (self.run_id, time.time() if timestamp is None else timestamp) + tuple(record)
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            # Never block the serial path on the database
+            self.dropped += 1
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        connection = connect(self.path)
+        insert = (f"INSERT INTO readings (run_id, timestamp, {', '.join(READING_COLUMNS)}) "
+                  f"VALUES ({', '.join('?' * (len(READING_COLUMNS) + 2))})")
+        rollups = [_runs_sql()] + [_rollup_sql(label, seconds) for label, seconds in ROLLUPS.items()]
+        running = True
+        while running:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    row = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if row is None:
+                    running = False
+                    break
+                batch.append(row)
+            if not batch:
+                continue
+            with connection:
+                last_rowid = connection.execute("SELECT COALESCE(MAX(rowid), 0) FROM readings").fetchone()[0]
+                connection.executemany(insert, batch)
+                for statement in rollups:
+                    connection.execute(statement, (last_rowid,))
+            self.inserted += len(batch)
+        connection.close()
+
+
+def runs_exceeding(path, threshold, column='t_ave_2nd'):
+    # Runs whose maximum of column (plenum average by default) went above threshold
+    if column not in ROLLUP_COLUMNS:
+        raise ValueError(f"No per-run summary for {column}")
+    connection = connect(path)
+    try:
+        return connection.execute(
+            f"SELECT run_id, started, ended, max_{column} FROM runs WHERE max_{column} > ? ORDER BY started",
+            (threshold,)).fetchall()
+    finally:
+        connection.close()
+
+
+def rollup(path, run_id, resolution='1m', start=None, end=None):
+    # (bucket, readings, avg/min/max per rollup column) for one run
+    if resolution not in ROLLUPS:
+        raise ValueError(f"Unknown rollup resolution {resolution}")
+    columns = ", ".join(f"{name}_sum / {name}_count, {name}_min, {name}_max" for name in ROLLUP_COLUMNS)
+    connection = connect(path)
+    try:
+        return connection.execute(
+            f"SELECT bucket, readings, {columns} FROM rollup_{resolution} "
+            f"WHERE run_id = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (run_id, float('-inf') if start is None else start, float('inf') if end is None else end)).fetchall()
+    finally:
+        connection.close()
@@ -0,0 +1,94 @@
+import ast
+import os
+import struct
+import subprocess
+import sys
+
+from PyQt5.QtCore import QResource
+
+# The generated res.py embeds every icon as Python byte literals and
+# registers them all on import. 'python resources.py' converts it once, as
+# a build step, into res.rcc; at runtime register() only maps that file
+# (Qt reads image pages when a screen loads a pixmap). The UI modules do
+# not import res themselves, so whichever of the two is used is chosen
+# here.
+
+RCC_VERSION = 2
+HERE = os.path.dirname(os.path.abspath(__file__))
+RES_PATH = os.path.join(HERE, 'res.py')
+RCC_PATH = os.path.join(HERE, 'res.rcc')
+
+
+def build_rcc(res_path=RES_PATH, rcc_path=RCC_PATH):
+    # Read the literals out of res.py without executing it
+    with open(res_path, 'rb') as f:
+        tree = ast.parse(f.read(), res_path)
+    blobs = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id.startswith('qt_resource_'):
+                    blobs[target.id] = node.value.value
+
+    tree_blob = blobs['qt_resource_struct_v2']
+    data_blob = blobs['qt_resource_data']
+    names_blob = blobs['qt_resource_name']
+    header_size = 20
+    tree_offset = header_size
+    data_offset = tree_offset + len(tree_blob)
+    names_offset = data_offset + len(data_blob)
+    header = b"qres" + struct.pack(">iiii", RCC_VERSION, tree_offset, data_offset, names_offset)
+
+    tmp_path = rcc_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header + tree_blob + data_blob + names_blob)
+    os.replace(tmp_path, rcc_path)
+    return rcc_path
+
+
+def register(rcc_path=RCC_PATH):
+    # Map the prebuilt res.rcc, or fall back to executing the embedded
+    # res.py when it has not been built. Call once before the first window
+    # is constructed; rebuild whenever res.py is regenerated.
+    if os.path.exists(rcc_path):
+        if QResource.registerResource(rcc_path):
+            return rcc_path
+        print(f"[WARNING] Could not register {rcc_path}")
+    else:
+        print("[DEBUG] res.rcc not built (python resources.py), using embedded res.py")
+    import res
+    return res.__file__
+
+
+_MEASURE = """
+import resource, sys, time
+sys.path.insert(0, {here!r})
+from PyQt5.QtCore import QFile
+import resources
+start = time.perf_counter()
+{load}
+elapsed = time.perf_counter() - start
+assert QFile.exists(':/images/T1.png')
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure(repeat=5):
+    # Time to make the images available and peak RSS, embedded res.py
+    # versus the prebuilt .rcc, each in a fresh interpreter
+    results = {}
+    for name, load in (('embedded', "import res"), ('rcc', "resources.register()")):
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', _MEASURE.format(here=HERE, load=load)],
+                                    capture_output=True, text=True, check=True).stdout.split()
+            runs.append((float(output[-2]), int(output[-1])))
+        results[name] = {'load_ms': min(r[0] for r in runs) * 1000, 'max_rss_kb': min(r[1] for r in runs)}
+    return results
+
+
+if __name__ == "__main__":
+    print("Built", build_rcc())
+    if '--measure' in sys.argv:
+        for name, result in measure().items():
+            print(f"{name}: {result['load_ms']:.2f} ms, peak RSS {result['max_rss_kb']} kB")
@@ -0,0 +1,114 @@
+import glob
+import math
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from telemetry_parser import TELEMETRY_SCHEMA
+
+# Columnar layout of one drying run: epoch milliseconds, float32 sensor
+# readings and uint8 PWM duty values (null when missing)
+ARCHIVE_SCHEMA = pa.schema(
+    [pa.field('timestamp', pa.int64())] +
+    [pa.field(name, pa.uint8() if converter is int else pa.float32()) for name, converter in TELEMETRY_SCHEMA]
+)
+PWM_FIELDS = {name for name, converter in TELEMETRY_SCHEMA if converter is int}
+
+
+class RunArchiveWriter:
+    # Buffers parsed TelemetryRecords in memory and writes them every
+    # flush_rows rows or flush_seconds seconds as a complete one-row-group
+    # part-NNNN.parquet in the run directory path. Each part has its own
+    # footer, so a run cut short by a crash or power loss loses at most
+    # the unflushed rows.
+    def __init__(self, path, flush_rows=600, flush_seconds=60.0):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        os.makedirs(path, exist_ok=True)
+        self.columns = {name: [] for name in ARCHIVE_SCHEMA.names}
+        self.pending = 0
+        self.rows = 0
+        self.row_groups = 0
+        self.last_flush = time.monotonic()
+
+    def append(self, record, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        self.columns['timestamp'].append(int(timestamp * 1000))
+        for name, value in zip(record._fields, record):
+            if name in PWM_FIELDS:
+                value = None if math.isnan(value) else min(max(int(value), 0), 255)
+            self.columns[name].append(value)
+        self.pending += 1
+        if self.pending >= self.flush_rows or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.pending:
+            return
+        table = pa.Table.from_pydict(self.columns, schema=ARCHIVE_SCHEMA)
+        part = os.path.join(self.path, f"part-{self.row_groups:04d}.parquet")
+        # Written aside and renamed, so a part is either whole or absent
+        pq.write_table(table, part + ".tmp", row_group_size=self.pending)
+        os.replace(part + ".tmp", part)
+        self.rows += self.pending
+        self.row_groups += 1
+        self.pending = 0
+        for values in self.columns.values():
+            values.clear()
+
+    def close(self):
+        self.flush()
+
+
+def run_parts(path):
+    # Parquet files of a run directory in write order (a single .parquet
+    # file is its own only part)
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+    return [path]
+
+
+def read_window(path, start=None, end=None, columns=None):
+    # Rows with start <= timestamp < end (epoch seconds) from a run
+    # directory. Parts and row groups whose timestamp statistics fall
+    # outside the window are never read.
+    start_ms = None if start is None else int(start * 1000)
+    end_ms = None if end is None else int(end * 1000)
+    if columns is not None and 'timestamp' not in columns:
+        columns = ['timestamp'] + list(columns)
+
+    tables = []
+    for part in run_parts(path):
+        parquet_file = pq.ParquetFile(part)
+        timestamp_index = parquet_file.schema_arrow.get_field_index('timestamp')
+        selected = []
+        for index in range(parquet_file.num_row_groups):
+            stats = parquet_file.metadata.row_group(index).column(timestamp_index).statistics
+            if stats is not None and stats.has_min_max:
+                if start_ms is not None and stats.max < start_ms:
+                    continue
+                if end_ms is not None and stats.min >= end_ms:
+                    continue
+            selected.append(index)
+        if selected:
+            tables.append(parquet_file.read_row_groups(selected, columns=columns))
+
+    if not tables:
+        return ARCHIVE_SCHEMA.empty_table().select(columns or ARCHIVE_SCHEMA.names).to_pandas()
+
+    table = pa.concat_tables(tables)
+    mask = None
+    if start_ms is not None:
+        mask = pc.greater_equal(table['timestamp'], start_ms)
+    if end_ms is not None:
+        upper = pc.less(table['timestamp'], end_ms)
+        mask = upper if mask is None else pc.and_(mask, upper)
+    if mask is not None:
+        table = table.filter(mask)
+    return table.to_pandas()
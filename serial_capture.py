@@ -0,0 +1,174 @@
+import argparse
+import struct
+import time
+
+CAPTURE_MAGIC = b"SCAP"
+CAPTURE_VERSION = 1
+_HEADER = struct.Struct("<4sBd")    # magic, version, epoch when the capture was opened
+_CHUNK = struct.Struct("<IH")       # microseconds since previous chunk, length
+MAX_DELTA_US = 0xFFFFFFFF
+MAX_CHUNK = 0xFFFF
+
+
+class CaptureWriter:
+    # Raw-capture tap: every chunk read from the serial port is appended
+    # as it arrived, before framing, with 6 bytes of timing/length per chunk.
+    # Registered on SerialReader.taps; write(data) / close().
+    def __init__(self, path, flush_interval=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.file = open(path, 'wb')
+        self.file.write(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time()))
+        self.last = time.monotonic()
+        self.last_flush = self.last
+        self.chunks = 0
+        self.bytes = 0
+
+    def write(self, data):
+        now = time.monotonic()
+        delta = round((now - self.last) * 1e6)
+        self.last = now
+        while delta > MAX_DELTA_US:
+            # Idle longer than ~71 minutes: carry the gap in empty chunks
+            self.file.write(_CHUNK.pack(MAX_DELTA_US, 0))
+            delta -= MAX_DELTA_US
+        for i in range(0, len(data), MAX_CHUNK):
+            part = data[i:i + MAX_CHUNK]
+            self.file.write(_CHUNK.pack(delta, len(part)))
+            self.file.write(part)
+            delta = 0
+        self.chunks += 1
+        self.bytes += len(data)
+        if now - self.last_flush >= self.flush_interval:
+            self.file.flush()
+            self.last_flush = now
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_capture(path):
+    # (epoch timestamp, bytes) for every chunk in a capture file
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} is not a serial capture")
+        magic, version, timestamp = _HEADER.unpack(header)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            raise ValueError(f"{path} is not a version {CAPTURE_VERSION} serial capture")
+        while True:
+            chunk = f.read(_CHUNK.size)
+            if len(chunk) < _CHUNK.size:
+                return      # a capture cut short by a crash ends at the last whole chunk
+            delta, length = _CHUNK.unpack(chunk)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            timestamp += delta / 1e6
+            if length:
+                yield timestamp, data
+
+
+class CaptureReplay:
+    # Port-like source over a capture file. next_delay() is the wall-clock
+    # wait before the next chunk: the recorded gap divided by speed, or 0
+    # for as-fast-as-possible replay (speed None).
+    def __init__(self, path, speed=1.0):
+        self.chunks = read_capture(path)
+        self.speed = speed
+        self.pending = next(self.chunks, None)
+        self.previous = self.pending[0] if self.pending else None
+        self.is_open = self.pending is not None
+
+    def next_delay(self):
+        if self.pending is None or not self.speed:
+            return 0.0
+        return max(self.pending[0] - self.previous, 0.0) / self.speed
+
+    def read(self):
+        if self.pending is None:
+            self.is_open = False
+            return b""
+        timestamp, data = self.pending
+        self.previous = timestamp
+        self.pending = next(self.chunks, None)
+        if self.pending is None:
+            self.is_open = False
+        return data
+
+    def close(self):
+        self.chunks.close()
+        self.pending = None
+        self.is_open = False
+
+
+def replay(path, feed, speed=None):
+    # Push every chunk into feed(data), e.g. SerialReader.feed, at the
+    # recorded timing scaled by speed or as fast as possible. Returns the
+    # number of chunks replayed.
+    source = CaptureReplay(path, speed)
+    chunks = 0
+    while source.is_open:
+        delay = source.next_delay()
+        if delay:
+            time.sleep(delay)
+        feed(source.read())
+        chunks += 1
+    return chunks
+
+
+def rerun(path):
+    # Re-run framing, parsing, ETA and fuzzy control over a whole capture.
+    # A record that fails processing is counted and skipped, like the
+    # headless controller's stage errors, so one bad reading cannot end
+    # the replay.
+    from binary_telemetry import BinaryFrame, FrameDemux
+    from calculate_emc import DryingTimeCache
+    from FLC_MaizeDry import TemperatureFuzzyController
+    from telemetry_parser import parse_telemetry
+
+    # Binary frames (BINARY_TELEMETRY firmware) and text lines, as in
+    # SerialReader.feed
+    demux = FrameDemux()
+    drying_time = DryingTimeCache()
+    fuzzy_ctrl = TemperatureFuzzyController(surface_resolution=0.5)
+    results = []
+    errors = []
+
+    def feed(data):
+        for item in demux.feed(data):
+            if isinstance(item, BinaryFrame):
+                record = item.record
+            else:
+                record = parse_telemetry(str(item, 'utf-8', 'ignore').strip())
+            if record is None:
+                continue
+            try:
+                results.append((record, drying_time(record.t_ave_2nd, record.h_ave),
+                                fuzzy_ctrl.compute_adjustment(record.t_ave_2nd, record.h_ave)))
+            except Exception as e:
+                errors.append((record, e))
+
+    started = time.perf_counter()
+    chunks = replay(path, feed)
+    return chunks, results, errors, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or re-run a raw serial capture")
+    parser.add_argument('path')
+    args = parser.parse_args()
+
+    chunks, results, errors, elapsed = rerun(args.path)
+    timestamps = [timestamp for timestamp, _ in read_capture(args.path)]
+    span = timestamps[-1] - timestamps[0] if timestamps else 0.0
+    print(f"{chunks} chunks, {len(results)} packets covering {span / 3600:.2f} h replayed in {elapsed:.2f} s")
+    if errors:
+        record, error = errors[0]
+        print(f"[ERROR] {len(errors)} packets failed, first at t_ave_2nd {record.t_ave_2nd} "
+              f"h_ave {record.h_ave}: {error}")
+    if results:
+        record, eta, adjustment = results[-1]
+        print(f"Last packet: t_ave_2nd {record.t_ave_2nd:.2f} h_ave {record.h_ave:.2f} "
+              f"ETA {eta} s adjustment {adjustment}")
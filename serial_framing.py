@@ -0,0 +1,87 @@
+class LineFramer:
+    # Newline framing on a preallocated ring buffer. Incoming chunks are
+    # copied in once; complete lines are yielded as memoryview slices of
+    # the ring (only a line that wraps around the end is joined into new
+    # bytes). A line longer than max_line_length is discarded, whether or
+    # not its newline arrived in the same chunk; without one, bytes are
+    # dropped up to the next newline so a missing terminator cannot grow
+    # memory.
+    def __init__(self, capacity=4096, max_line_length=1024):
+        if max_line_length >= capacity:
+            raise ValueError("capacity must be larger than max_line_length")
+        self.capacity = capacity
+        self.max_line_length = max_line_length
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.start = 0      # ring index of the first buffered byte
+        self.length = 0     # bytes buffered (the current partial line)
+        self.scanned = 0    # bytes of the partial line already searched
+        self.discarding = False
+        self.lines = 0
+        self.overflows = 0
+
+    def feed(self, data):
+        # Yielded views are only valid until the next call to feed
+        data = memoryview(data)
+        while len(data):
+            free = self.capacity - self.length
+            piece, data = data[:free], data[free:]
+            self._write(piece)
+            yield from self._scan()
+
+    def _write(self, piece):
+        end = (self.start + self.length) % self.capacity
+        first = min(len(piece), self.capacity - end)
+        self.view[end:end + first] = piece[:first]
+        if first < len(piece):
+            self.view[:len(piece) - first] = piece[first:]
+        self.length += len(piece)
+
+    def _find_newline(self):
+        # Logical offset of the next newline in the unscanned bytes, which
+        # occupy at most two contiguous runs of the ring
+        begin = self.start + self.scanned
+        stop = self.start + self.length
+        if begin < self.capacity:
+            pos = self.buffer.find(b"\n", begin, min(stop, self.capacity))
+            if pos >= 0:
+                return pos - self.start
+            begin = self.capacity
+        if stop > self.capacity:
+            pos = self.buffer.find(b"\n", begin - self.capacity, stop - self.capacity)
+            if pos >= 0:
+                return pos + self.capacity - self.start
+        return -1
+
+    def _line(self, length):
+        end = self.start + length
+        if end <= self.capacity:
+            return self.view[self.start:end]
+        return bytes(self.view[self.start:]) + bytes(self.view[:end - self.capacity])
+
+    def _scan(self):
+        while self.length:
+            offset = self._find_newline()
+            if offset < 0:
+                self.scanned = self.length
+                if self.length > self.max_line_length:
+                    self.overflows += 1
+                    self.discarding = True
+                    self._consume(self.length)
+                return
+            if self.discarding:
+                self.discarding = False
+            elif offset > self.max_line_length:
+                # Arrived whole with its newline, but still too long
+                self.overflows += 1
+            else:
+                self.lines += 1
+                yield self._line(offset)
+            self._consume(offset + 1)
+
+    def _consume(self, count):
+        self.start = (self.start + count) % self.capacity
+        self.length -= count
+        self.scanned = 0
+        if not self.length:
+            self.start = 0
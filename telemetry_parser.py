@@ -0,0 +1,143 @@
+import math
+import re
+import timeit
+from collections import namedtuple
+from dataclasses import dataclass
+
+# Fields of the key:value line printed by buttonless_2_heater_parsing.ino,
+# in firmware order
+TELEMETRY_SCHEMA = (
+    [(f"T{i}", float) for i in range(1, 9)] +
+    [("H1", float), ("H2", float),
+     ("t_ave_first", float), ("t_ave_2nd", float), ("h_ave", float),
+     ("pwm_1", int), ("pwm_2", int)]
+)
+TELEMETRY_TERMINATOR = "pwm_2"
+
+TelemetryRecord = namedtuple('TelemetryRecord', [name for name, _ in TELEMETRY_SCHEMA])
+ColorRecord = namedtuple('ColorRecord', ['r', 'g', 'b'])
+ThermocoupleRecord = namedtuple('ThermocoupleRecord', ['temperature'])
+
+
+@dataclass(frozen=True)
+class TelemetrySnapshot:
+    # One parsed packet as handed to the screens: typed values, wall-clock
+    # receive time and the perf_counter time its bytes arrived
+    __slots__ = ('record', 'timestamp', 'arrival')
+    record: TelemetryRecord
+    timestamp: float
+    arrival: float
+
+RGB_PATTERN = re.compile(r"RGB=\s*(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+)")
+MAX31855_PATTERN = re.compile(r"Max31855:\s*(\S+)")
+
+
+def _convert(converter, text):
+    # Missing or unreadable values become NaN
+    try:
+        return converter(text)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def compile_parser(schema=TELEMETRY_SCHEMA, terminator=TELEMETRY_TERMINATOR, record=TelemetryRecord):
+    # Build a parser for one schema: a regex matching the exact firmware
+    # layout handles the common case in a single pass, and a token/dict
+    # path handles reordered or missing fields.
+    names = [name for name, _ in schema]
+    converters = [converter for _, converter in schema]
+    layout = re.compile(r"\s*" + r"\s+".join(rf"{re.escape(name)}:(\S*)" for name in names) + r"\s*$")
+    marker = terminator + ":"
+
+    def parse(line):
+        if marker not in line:
+            return None
+        match = layout.match(line)
+        if match:
+            values = match.groups()
+            try:
+                return record._make([converter(value) for converter, value in zip(converters, values)])
+            except ValueError:
+                return record._make([_convert(converter, value) for converter, value in zip(converters, values)])
+
+        fields = {}
+        for part in line.split():
+            key, sep, value = part.partition(':')
+            if sep:
+                fields[key] = value
+        return record._make([_convert(converter, fields.get(name)) for name, converter in schema])
+
+    # Lines that only parse through the fallback path do not match this
+    parse.layout = layout
+    return parse
+
+
+parse_telemetry = compile_parser()
+
+
+def format_value(value):
+    # Label text for a parsed value, matching the firmware's 2-decimal prints
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.2f}"
+
+
+def parse_line(line):
+    # TelemetryRecord, ColorRecord or ThermocoupleRecord, or None for
+    # status/other lines
+    record = parse_telemetry(line)
+    if record is not None:
+        return record
+    if line.startswith("RGB="):
+        match = RGB_PATTERN.match(line)
+        if match:
+            return ColorRecord(*(int(value) for value in match.groups()))
+        return None
+    if line.startswith("Max31855:"):
+        match = MAX31855_PATTERN.match(line)
+        return ThermocoupleRecord(_convert(float, match.group(1) if match else None))
+    return None
+
+
+def legacy_parse(line):
+    # Reference copy of Main_Controller.SerialReader.process_line before
+    # the schema parser, kept for the benchmark below
+    if "pwm_2:" not in line:
+        return None
+    parts = line.split()
+    parsed = {}
+    for part in parts:
+        if ':' in part:
+            k, v = part.split(':', 1)
+            parsed[k.strip()] = v.strip()
+    data = {
+        'T': parsed.get("t_ave_2nd", "0"),
+        'H': parsed.get("h_ave", "0"),
+        'pwm2': parsed.get("pwm_2", "0"),
+        'pwm1': parsed.get("pwm_1", "0"),
+        'temps': [parsed.get(f"T{i+1}", "0") for i in range(4)],
+        'dry_temps': [parsed.get(f"T{i+5}", "0") for i in range(4)],
+        'hum': [parsed.get("H1", "0"), parsed.get("H2", "0")],
+        't_ave_first': parsed.get("t_ave_first", "0")
+    }
+    # Every consumer converts the strings it needs again
+    float(data['T']), float(data['H'])
+    return data
+
+
+def benchmark(number=20000):
+    line = ("T1:30.10 T2:30.20 T3:30.30 T4:30.40 T5:40.10 T6:40.20 T7:40.30 T8:40.40 "
+            "H1:50.00 H2:52.00 t_ave_first:30.25 t_ave_2nd:40.25 h_ave:51.00 pwm_1:120 pwm_2:200")
+    results = {}
+    for name, parser in (('legacy', legacy_parse), ('schema', parse_line)):
+        seconds = min(timeit.repeat(lambda: parser(line), number=number, repeat=5))
+        results[name] = seconds / number * 1e6
+    return results
+
+
+if __name__ == "__main__":
+    for sample in ("T1:30.10 T2:nan H1:50.00 h_ave:51.00 pwm_2:200", "RGB=120,80,40", "Max31855: 41.25",
+                   "Not dry yet."):
+        print(f"{sample!r} -> {parse_line(sample)}")
+    for name, micros in benchmark().items():
+        print(f"{name} parser: {micros:.2f} us/line")
@@ -0,0 +1,187 @@
+import bisect
+
+
+class LatencyHistogram:
+    # Fixed-bucket histogram of latencies in seconds, reported in ms
+    # 50 ms steps from 100 to 500 ms, where polled and event-driven serial
+    # reads differ
+    DEFAULT_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 150, 200, 250, 300, 350, 400, 450, 500, 1000, 2000)
+
+    def __init__(self, edges_ms=DEFAULT_EDGES_MS):
+        self.edges_ms = tuple(edges_ms)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.edges_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.edges_ms, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.minimum = ms if self.minimum is None else min(self.minimum, ms)
+        self.maximum = ms if self.maximum is None else max(self.maximum, ms)
+
+    def percentile(self, fraction):
+        # Upper edge of the bucket holding the given fraction of samples,
+        # but never above the largest sample seen
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for edge, count in zip(self.edges_ms, self.counts):
+            seen += count
+            if seen >= target:
+                return min(edge, self.maximum)
+        return self.maximum
+
+    def summary(self):
+        buckets = {f"<={edge}ms": count for edge, count in zip(self.edges_ms, self.counts)}
+        buckets[f">{self.edges_ms[-1]}ms"] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else None,
+            'min_ms': self.minimum,
+            'max_ms': self.maximum,
+            'p50_ms': self.percentile(0.5),
+            'p99_ms': self.percentile(0.99),
+            'buckets': buckets,
+        }
+
+
+class LinkStats:
+    # Accounting for one serial link: bytes and rate, packets received,
+    # coalesced before display and emitted, malformed input by kind, and
+    # gaps. Gaps come from the frame sequence number when there is one,
+    # otherwise from arrivals later than gap_factor x expected_interval
+    # (the firmware prints every 2 s). Times are perf_counter seconds.
+    INTER_ARRIVAL_EDGES_MS = (100, 500, 1000, 1500, 1900, 1950, 2000, 2050, 2100, 2500, 3000, 5000, 10000)
+
+    def __init__(self, expected_interval=2.0, gap_factor=1.5, rate_window=5.0):
+        self.expected_interval = expected_interval
+        self.gap_factor = gap_factor
+        self.rate_window = rate_window
+        self.inter_arrival = LatencyHistogram(self.INTER_ARRIVAL_EDGES_MS)
+        self.jitter = LatencyHistogram()
+        self.reset()
+
+    def reset(self):
+        self.started = None
+        self.bytes = 0
+        self.chunks = 0
+        self.window_start = None
+        self.window_bytes = 0
+        self.bytes_per_second = 0.0
+        self.packets = 0
+        self.coalesced = 0
+        self.emitted = 0
+        self.malformed = {'decode': 0, 'layout': 0}
+        self.gaps = 0
+        self.missing = 0
+        self.restarts = 0
+        self.duplicates = 0
+        self.last_arrival = None
+        self.last_sequence = None
+        self.inter_arrival.reset()
+        self.jitter.reset()
+
+    def on_bytes(self, count, now):
+        if self.started is None:
+            self.started = self.window_start = now
+        self.bytes += count
+        self.chunks += 1
+        self.window_bytes += count
+        if now - self.window_start >= self.rate_window:
+            self.bytes_per_second = self.window_bytes / (now - self.window_start)
+            self.window_start = now
+            self.window_bytes = 0
+
+    def rate(self, now):
+        # Bytes/s over the last completed window, or the current one once it
+        # is complete or before any window has completed (a silent link
+        # decays to 0)
+        if self.window_start is None:
+            return 0.0
+        elapsed = now - self.window_start
+        if elapsed >= self.rate_window or (not self.bytes_per_second and elapsed > 0):
+            return self.window_bytes / elapsed
+        return self.bytes_per_second
+
+    def on_malformed(self, kind):
+        self.malformed[kind] = self.malformed.get(kind, 0) + 1
+
+    def on_packet(self, now, sequence=None):
+        self.packets += 1
+        if self.last_arrival is not None:
+            interval = now - self.last_arrival
+            self.inter_arrival.record(interval)
+            self.jitter.record(abs(interval - self.expected_interval))
+            if sequence is None and interval > self.gap_factor * self.expected_interval:
+                self.gaps += 1
+                self.missing += max(round(interval / self.expected_interval) - 1, 1)
+        if sequence is not None and self.last_sequence is not None:
+            skipped = (sequence - self.last_sequence - 1) % 0x10000
+            if sequence == self.last_sequence:
+                # The same frame twice is neither a gap nor a restart
+                self.duplicates += 1
+            elif skipped >= 0x8000:
+                # Sequence went backwards: the sender restarted
+                self.restarts += 1
+            elif skipped:
+                self.gaps += 1
+                self.missing += skipped
+        self.last_arrival = now
+        if sequence is not None:
+            self.last_sequence = sequence
+
+    def on_coalesced(self):
+        self.coalesced += 1
+
+    def on_emitted(self):
+        self.emitted += 1
+
+    def snapshot(self, now, **malformed):
+        # Extra malformed counts kept elsewhere (CRC failures, overlong
+        # lines) are passed in by keyword
+        malformed = dict(self.malformed, **malformed)
+        elapsed = now - self.started if self.started is not None else 0.0
+        return {
+            'bytes': self.bytes,
+            'chunks': self.chunks,
+            'bytes_per_second': self.rate(now),
+            'mean_bytes_per_second': self.bytes / elapsed if elapsed else 0.0,
+            'packets': self.packets,
+            'coalesced': self.coalesced,
+            'emitted': self.emitted,
+            'malformed': malformed,
+            'malformed_total': sum(malformed.values()),
+            'gaps': self.gaps,
+            'missing_packets': self.missing,
+            'restarts': self.restarts,
+            'duplicates': self.duplicates,
+            'inter_arrival': self.inter_arrival.summary(),
+            'jitter': self.jitter.summary(),
+        }
+
+
+def format_link_stats(stats):
+    # Plain-text rendering for the diagnostics screen
+    lines = [
+        f"Bytes: {stats['bytes']} in {stats['chunks']} reads, {stats['bytes_per_second']:.1f} B/s "
+        f"(mean {stats['mean_bytes_per_second']:.1f} B/s)",
+        f"Packets: {stats['packets']} received, {stats['emitted']} shown, {stats['coalesced']} coalesced",
+        f"Gaps: {stats['gaps']} ({stats['missing_packets']} packets missing), sender restarts {stats['restarts']}, "
+        f"duplicates {stats['duplicates']}",
+        "Malformed: " + ", ".join(f"{kind} {count}" for kind, count in stats['malformed'].items()),
+    ]
+    for name in ('inter_arrival', 'jitter'):
+        summary = stats[name]
+        if summary['count']:
+            lines.append(f"{name.replace('_', ' ').capitalize()}: mean {summary['mean_ms']:.0f} ms, "
+                         f"p50 <={summary['p50_ms']:.0f} ms, p99 <={summary['p99_ms']:.0f} ms, max {summary['max_ms']:.0f} ms")
+            lines.extend(f"  {bucket:>10} {count}" for bucket, count in summary['buckets'].items() if count)
+    return "\n".join(lines)
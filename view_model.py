@@ -0,0 +1,79 @@
+from PyQt5.QtCore import QObject, QTimer, QEvent, pyqtSignal
+
+FRAME_INTERVAL_MS = 16
+
+
+class ViewModel(QObject):
+    # Latest value of every displayed field, pushed to the screens at most
+    # once per frame. Only visible screens are touched, only labels whose
+    # text actually changed get setText. Qt merges the labels' update()
+    # requests into the next paint, so a frame repaints only the labels that
+    # changed. A screen that becomes visible is brought up to date before it
+    # paints.
+    frame_done = pyqtSignal()
+
+    def __init__(self, frame_interval=FRAME_INTERVAL_MS):
+        super().__init__()
+        self.values = {}
+        self.screens = {}
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(frame_interval)
+        self.frame_timer.timeout.connect(self.flush)
+        self.updates = 0
+        self.frames = 0
+        self.applied = 0
+        self.skipped_unchanged = 0
+        self.skipped_hidden = 0
+
+    def register(self, window, bindings):
+        # bindings: field -> (label name on window.ui, format string)
+        labels = [(field, getattr(window.ui, name), fmt) for field, (name, fmt) in bindings.items()]
+        self.screens[window] = (labels, {})
+        window.installEventFilter(self)
+        if window.isVisible():
+            self.apply(window)
+
+    def update(self, values):
+        self.values.update(values)
+        self.updates += 1
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def show_snapshot(self, snapshot):
+        record = snapshot.record
+        self.update(zip(record._fields, record))
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Show and obj in self.screens:
+            self.apply(obj)
+        return False
+
+    def flush(self):
+        self.frames += 1
+        for window, (labels, _) in self.screens.items():
+            if window.isVisible():
+                self.apply(window)
+            else:
+                self.skipped_hidden += len(labels)
+        self.frame_done.emit()
+
+    def apply(self, window):
+        labels, shown = self.screens[window]
+        changed = []
+        for field, label, fmt in labels:
+            if field not in self.values:
+                continue
+            text = fmt.format(self.values[field])
+            if shown.get(field) == text:
+                self.skipped_unchanged += 1
+            else:
+                shown[field] = text
+                changed.append((label, text))
+        for label, text in changed:
+            label.setText(text)
+        self.applied += len(changed)
+
+    def stats(self):
+        return {'updates': self.updates, 'frames': self.frames, 'applied': self.applied,
+                'skipped_unchanged': self.skipped_unchanged, 'skipped_hidden': self.skipped_hidden}